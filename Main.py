@@ -11,17 +11,20 @@ import os  # Filepath operations
 import random  # Any rng aspect
 import textwrap  # Life saver for text display
 import math  # Anim calculations mainly
-
-# Pygame mixer
-pygame.mixer.init()
-pygame.init()
-
-# App icon
-try:
-    icon_image = pygame.image.load("Meshes\\logo.png")
-    pygame.display.set_icon(icon_image)
-except Exception as e:
-    print(f"Logo load error: {e}")
+from collections import OrderedDict, Counter, deque  # LRU bookkeeping for caches, aced id counts, profiler ring buffers
+import functools  # Memoized text wrapping
+import time  # Load timings
+import zlib  # Journal record checksums
+import sqlite3  # Optional question and progress store
+import argparse  # Storage command line
+import hashlib  # Content hashes for derived image variants
+import re  # Answer syntax
+from fractions import Fraction  # Exact numeric answers
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # Parallel part loading, image pre-warming
+import threading  # Background image prefetching
+import queue  # Work queue for background threads
+import heapq  # Session scheduling
+import bisect  # Slots removed from a scheduled session
 
 # Constants
 SCREEN_WIDTH = 1280
@@ -35,6 +38,10 @@ BUTTON_HOVER_COLOR = (80, 80, 180)
 PROGRESS_BAR_COLOR = (0, 0, 255)
 COPYRIGHT_TEXT = "© Educa College Prep - All Rights of 'sat_data' Reserved to Educa, more info on readme"
 DATA_DIR = "sat_data"
+STORAGE_BACKEND = os.environ.get("SAT_STORAGE", "json")  # "json" or "sqlite", run `python Main.py import-json` before switching
+SQLITE_PATH = os.path.join(DATA_DIR, "sat_data.db")
+PROFILE = os.environ.get("SAT_PROFILE", "default")  # Whose progress is loaded, the part files themselves are shared
+PROGRESS_DIR = "progress"  # Per-profile aced lists, journals, schedule and session, in DATA_DIR/progress/<profile>
 
 # List of current subjects
 SUBJECT_PARTS = [
@@ -66,82 +73,465 @@ FILL_IN_VARIATIONS = [
     "fill in blanks", "Fill-in"
 ]
 
-# Load icons with fallback in 36 x 36
-if not os.path.exists('Meshes/folder_icon.png'):
-    print("Warning: Missing folder_icon.png")
-    FOLDER_ICON = pygame.Surface((36, 36))  # Placeholder to scale
-    FOLDER_ICON.fill(GRAY)
-else:
-    FOLDER_ICON = pygame.image.load('Meshes/folder_icon.png')
-    FOLDER_ICON = pygame.transform.scale(FOLDER_ICON, (36, 36))  # Scaling
-
-if not os.path.exists('Meshes/drive.png'):
-    print("Warning: Missing drive.png")
-    DRIVE_ICON = pygame.Surface((36, 36))
-    DRIVE_ICON.fill(GRAY)
-else:
-    DRIVE_ICON = pygame.image.load('Meshes/drive.png')
-    DRIVE_ICON = pygame.transform.scale(DRIVE_ICON, (36, 36))
-
-if not os.path.exists('Meshes/trophy.png'):
-    print("Warning: Missing trophy.png")
-    TROPHY_ICON = pygame.Surface((36, 36))
-    TROPHY_ICON.fill(GRAY)
-else:
-    TROPHY_ICON = pygame.image.load('Meshes/trophy.png')
-    TROPHY_ICON = pygame.transform.scale(TROPHY_ICON, (36, 36))
+SCHEDULER = "none"  # Session order: "none" for file order (shuffled with Randomize), or opt in to "sm2" or "leitner"
+SCHEDULE_FILE = "schedule.json"  # Due times and ease per question, in the profile's progress folder
+RELEARN_DELAY = 600  # Seconds until a missed question is due again
+LEITNER_INTERVALS = [0, 1, 3, 7, 21, 60]  # Days between reviews per Leitner box
+SESSION_FILE = "session.json"  # Checkpoint of the running quiz session, in the profile's progress folder
+CHECKPOINT_INTERVAL = 10  # Seconds between checkpoints while only the timer changes
+ANSWER_TOLERANCE = Fraction(1, 100)  # Default slack for numeric fill-in answers, "3.14 +- 0.005" sets its own
 
 # Volume and animation settings
 VOLUMES = {'click': 1.0, 'correct': 1.0, 'incorrect': 1.0}
 ANIMATION_DURATION = 2000
 SUBMIT_COOLDOWN = 5000  # <<<< Milliseconds btw
+IMAGE_CACHE_BUDGET = 96 * 1024 * 1024  # Bytes of decoded images kept in memory
+PREFETCH_AHEAD = 4  # Upcoming questions decoded in the background
+TEXT_CACHE_SIZE = 1024  # Rendered text surfaces kept around
+LOADER_WORKERS = 4  # Threads parsing sat_data part files at startup
+JOURNAL_COMPACT_EVERY = 64  # Progress records per part before they are folded into the progress file
+PERSIST_DEBOUNCE = 0.3  # Seconds a file waits for further writes before hitting the disk
+PERSIST_MAX_DELAY = 1.0  # Longest a file that keeps changing is held back
+FRAME_RATE = 30  # Frames per second the main loop is capped at
+PROFILE_FRAMES = 300  # Frames kept for the profiler overlay percentiles
+PROFILE_SPANS = 50000  # Spans kept for Chrome trace export
+TRACE_PATH = "frame_trace.json"  # Written with F4, open in chrome://tracing or ui.perfetto.dev
+DERIVED_IMAGE_DIR = ".image_cache"  # Pre-scaled image variants, safe to delete
+DERIVED_IMAGES = True  # Load scaled images from DERIVED_IMAGE_DIR instead of decoding the full source
+TRIM_THRESHOLD = 24  # How far from pure white a margin pixel may be and still get trimmed
+TRIM_PADDING = 8  # White border kept around trimmed content
+SHEET_TILE_HEIGHT = 256  # Rows per answer sheet tile
+SHEET_RESIDENT_TILES = 8  # Scaled answer sheet tiles kept around, enough for the viewport plus scrolling slack
+HIT_GRID_CELL = 64  # Pixels per side of a spatial index cell
+HIT_SCAN_LIMIT = 8  # Widget lists this short are scanned instead of indexed
+HIT_INDEXES = 32  # Spatial indexes kept for widget lists that are no longer on screen
+SCROLL_IMPULSE = 900  # Pixels per second one wheel notch adds to a list's scroll speed
+SCROLL_FRICTION = 6.0  # How quickly a flung list slows down, per second
+THUMB_SIZE = (48, 48)  # Aced view filmstrip thumbnails, also the placeholder while scrubbing
+THUMB_ATLAS_SLOTS = 512  # Thumbnails kept in the atlas surface
+SCRUB_SETTLE_MS = 200  # Longest the aced view shows a thumbnail after moving before decoding the full image itself
+ACED_PREFETCH = 2  # Aced questions on each side of the current one decoded ahead
+
+# Sound files and the volume slider each one follows
+SOUND_FILES = {
+    'click': ('Sounds/click.wav', 'click'),
+    'correct': ('Sounds/correct.wav', 'correct'),
+    'incorrect': ('Sounds/incorrect.wav', 'incorrect'),
+    'paper_fold': ('Sounds/paper_fold.wav', 'click'),
+}
+# Reserved mixer channel per sound; correct/incorrect share one so new feedback cuts off the old
+SOUND_CHANNELS = {'correct': 0, 'incorrect': 0, 'click': 1, 'paper_fold': 2}
+AUDIO_LOW_LATENCY = True  # Open the mixer with a small buffer, False keeps SDL's defaults
+AUDIO_FREQUENCY = 44100
+AUDIO_BUFFER = 256  # Samples per mixer buffer, 256 at 44.1 kHz is under 6 ms
+AUDIO_CHANNELS = 8  # Mixer channels, the first few are reserved through SOUND_CHANNELS
+SOUND_BUTTON_CLICK = 'click'
+SOUND_CORRECT = 'correct'
+SOUND_INCORRECT = 'incorrect'
+SOUND_PAPER_FOLD = 'paper_fold'
+
+# Icon files, loaded on first use in 36 x 36
+ICON_FILES = {
+    'folder': 'Meshes/folder_icon.png',
+    'drive': 'Meshes/drive.png',
+    'trophy': 'Meshes/trophy.png',
+}
+
+# Display, fonts and clock are created by init_display() so importing this module stays free of side effects
+screen = None
+font = None
+large_font = None
+clock = None
+sounds = {}
+icons = {}
+
+def init_display(headless=False):
+    """Initialize pygame, open the window and create the fonts; later calls are no-ops."""
+    global screen, font, large_font, clock
+    if screen is not None:
+        return screen
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    init_audio()
+    pygame.init()
+    try:
+        pygame.display.set_icon(pygame.image.load(os.path.join("Meshes", "logo.png")))
+    except Exception as e:
+        print(f"Logo load error: {e}")
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("SAT Study Helper")
+    font = pygame.font.Font(None, 36)
+    large_font = pygame.font.Font(None, 72)
+    clock = pygame.time.Clock()
+    return screen
+
+class AudioStats:
+    """Delay from the frame's input poll to a sound being queued, plus the mixer buffer it waits in."""
+    def __init__(self):
+        self.buffer_ms = 0.0
+        self.plays = 0
+        self.dropped = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
 
-# Sound initialization with error handling
-try:
-    SOUND_BUTTON_CLICK = pygame.mixer.Sound('Sounds/click.wav')
-    SOUND_CORRECT = pygame.mixer.Sound('Sounds/correct.wav')
-    SOUND_INCORRECT = pygame.mixer.Sound('Sounds/incorrect.wav')
-    SOUND_PAPER_FOLD = pygame.mixer.Sound('Sounds/paper_fold.wav')
-except Exception as e:
-    print(f"Sound error: {e}")
-    SOUND_BUTTON_CLICK = pygame.mixer.Sound(buffer=b'')
-    SOUND_CORRECT = pygame.mixer.Sound(buffer=b'')
-    SOUND_INCORRECT = pygame.mixer.Sound(buffer=b'')
-    SOUND_PAPER_FOLD = pygame.mixer.Sound(buffer=b'')
-
-SOUND_BUTTON_CLICK.set_volume(VOLUMES['click'])
-SOUND_CORRECT.set_volume(VOLUMES['correct'])
-SOUND_INCORRECT.set_volume(VOLUMES['incorrect'])
-SOUND_PAPER_FOLD.set_volume(VOLUMES['click'])
-
-# Setup display, font, and clock
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("SAT Study Helper")
-font = pygame.font.Font(None, 36)
-large_font = pygame.font.Font(None, 72)
-clock = pygame.time.Clock()
+    def record(self, queued_at):
+        latency = (time.perf_counter() - queued_at) * 1000 + self.buffer_ms
+        self.plays += 1
+        self.total_ms += latency
+        self.max_ms = max(self.max_ms, latency)
+
+    def stats(self):
+        return {
+            'plays': self.plays,
+            'dropped': self.dropped,
+            'buffer_ms': round(self.buffer_ms, 2),
+            'avg_latency_ms': round(self.total_ms / self.plays, 2) if self.plays else 0.0,
+            'max_latency_ms': round(self.max_ms, 2),
+        }
+
+audio_stats = AudioStats()
+channels = {}
+
+def init_audio():
+    """Open the mixer, reserve one channel per SOUND_CHANNELS slot and preload the sounds."""
+    if AUDIO_LOW_LATENCY:
+        pygame.mixer.pre_init(AUDIO_FREQUENCY, -16, 2, AUDIO_BUFFER)
+    try:
+        pygame.mixer.init()
+    except pygame.error as e:
+        print(f"Mixer init error: {e}")
+        return
+    pygame.mixer.set_num_channels(max(AUDIO_CHANNELS, max(SOUND_CHANNELS.values()) + 1))
+    pygame.mixer.set_reserved(max(SOUND_CHANNELS.values()) + 1)  # play() without a channel never steals these
+    frequency, _, _ = pygame.mixer.get_init()
+    audio_stats.buffer_ms = AUDIO_BUFFER * 1000 / frequency if AUDIO_LOW_LATENCY else 0.0
+    for name in SOUND_FILES:
+        get_sound(name)  # Decoding a wav on the first click would delay that click's feedback
+
+def get_icon(name):
+    """Return a 36 x 36 icon, loading it on first use with a gray placeholder fallback."""
+    icon = icons.get(name)
+    if icon is None:
+        path = ICON_FILES[name]
+        if not os.path.exists(path):
+            print(f"Warning: Missing {os.path.basename(path)}")
+            icon = pygame.Surface((36, 36))  # Placeholder to scale
+            icon.fill(GRAY)
+        else:
+            icon = pygame.transform.scale(pygame.image.load(path), (36, 36))  # Scaling
+        icons[name] = icon
+    return icon
+
+def get_sound(name):
+    """Return a sound, loading it on first use; None when the mixer is unavailable."""
+    if name not in sounds:
+        path, volume_key = SOUND_FILES[name]
+        try:
+            sound = pygame.mixer.Sound(path)
+            sound.set_volume(VOLUMES[volume_key])
+        except Exception as e:
+            print(f"Sound error: {e}")
+            sound = None
+        sounds[name] = sound
+    return sounds[name]
+
+def apply_volumes():
+    """Push the VOLUMES settings to every sound loaded so far."""
+    for name, sound in sounds.items():
+        if sound is not None:
+            sound.set_volume(VOLUMES[SOUND_FILES[name][1]])
 
 # Utility function to safely play sounds
 def play_safe(sound):
     try:
-        sound.play()
+        name = sound
+        sound = get_sound(name)
+        if sound is None:
+            return
+        channel_id = SOUND_CHANNELS.get(name)
+        if channel_id is not None:
+            channel = channels.get(channel_id)
+            if channel is None:
+                channel = channels[channel_id] = pygame.mixer.Channel(channel_id)
+            channel.play(sound)  # Restarts the channel, feedback is never queued behind busy channels
+        elif sound.play() is None:
+            audio_stats.dropped += 1
+            return
+        audio_stats.record(frame_profiler.frame_start)
     except Exception as e:
         print(f"Sound play error: {e}")
 
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color, antialias)."""
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+        }
+
+text_cache = TextCache()
+
+def render_text(font, text, antialias, color):
+    """Drop-in for font.render that reuses surfaces; never draw onto the result."""
+    return text_cache.render(font, text, tuple(color), antialias)
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def wrap_text(text, width):
+    return tuple(textwrap.wrap(text, width=width))
+
 def draw_wrapped_text(surface, text, x, y, font, color, max_width):
-    wrapped_lines = textwrap.wrap(text, width=max_width // font.size(" ")[0])
+    wrapped_lines = wrap_text(text, max_width // font.size(" ")[0])
     y_offset = 0
     for line in wrapped_lines:
-        text_surface = font.render(line, True, color)
+        text_surface = render_text(font, line, True, color)
         surface.blit(text_surface, (x, y + y_offset))
         y_offset += font.get_height()
 
-def draw_loading_screen(screen, message):
+class DirtyRegions:
+    """Tracks which widget rects changed since the last frame and pushes only those to the display.
+
+    Widgets report what they drew with track(); anything not tracked is covered by the
+    scene key passed to present(), which forces a full flip whenever it changes.
+    """
+    def __init__(self):
+        self.previous = {}
+        self.current = {}
+        self.rects = []
+        self.scene_key = None
+        self.full_frames = 2  # Events are handled before or after drawing depending on the screen
+        self.show_debug = False
+        self.debug_rects = []
+        self.full_updates = 0
+        self.partial_updates = 0
+        self.idle_frames = 0
+
+    def track(self, widget, rect, key):
+        rect = pygame.Rect(rect)
+        widget_id = id(widget) if not isinstance(widget, str) else widget
+        self.current[widget_id] = (rect, key)
+        old = self.previous.get(widget_id)
+        if old is None:
+            self.rects.append(rect)
+        elif old[1] != key or old[0] != rect:
+            self.rects.append(old[0])
+            self.rects.append(rect)
+
+    def mark(self, rect):
+        self.rects.append(pygame.Rect(rect))
+
+    def mark_all(self):
+        self.full_frames = max(self.full_frames, 1)
+
+    def present(self, surface, scene_key):
+        if scene_key != self.scene_key:
+            self.scene_key = scene_key
+            self.full_frames = 2
+        for widget_id, (rect, key) in self.previous.items():
+            if widget_id not in self.current:
+                self.rects.append(rect)  # Widget disappeared, uncover what was under it
+        bounds = surface.get_rect()
+        rects = [r.clip(bounds) for r in self.rects + self.debug_rects]
+        rects = [r for r in rects if r.width and r.height]
+        if sum(r.width * r.height for r in rects) > bounds.width * bounds.height // 2:
+            self.full_frames = max(self.full_frames, 1)
+        self.debug_rects = []
+        if self.show_debug:
+            outlines = [bounds] if self.full_frames else rects
+            for rect in outlines:
+                pygame.draw.rect(surface, (255, 0, 0), rect, 2)
+            self.debug_rects = [r.copy() for r in outlines]  # Erase the outlines next frame
+        if self.full_frames:
+            pygame.display.flip()
+            self.full_frames -= 1
+            self.full_updates += 1
+        elif rects:
+            pygame.display.update(rects)
+            self.partial_updates += 1
+        else:
+            self.idle_frames += 1
+        self.previous, self.current = self.current, {}
+        self.rects = []
+
+    def stats(self):
+        return {
+            'full': self.full_updates,
+            'partial': self.partial_updates,
+            'idle': self.idle_frames,
+        }
+
+dirty_regions = DirtyRegions()
+
+class ProfileSpan:
+    __slots__ = ('profiler', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, profiler, name, cat, args):
+        self.profiler = profiler
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.cat, self.start, time.perf_counter(), self.args)
+        return False
+
+class FrameProfiler:
+    """Times each phase of the main loop and records spans from any thread.
+
+    Frames keep per-phase durations for the F2 overlay; spans are kept in a ring buffer
+    and exported as Chrome trace events with F4.
+    """
+    def __init__(self, max_frames=PROFILE_FRAMES, max_spans=PROFILE_SPANS):
+        self.frames = deque(maxlen=max_frames)
+        self.spans = deque(maxlen=max_spans)  # (name, cat, start, end, thread id, args)
+        self.thread_names = {}
+        self.origin = time.perf_counter()
+        self.current = {}
+        self.frame_start = self.phase_start = self.origin
+        self.show_overlay = False
+        self.overlay_font = None
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_start = self.phase_start = time.perf_counter()
+
+    def phase(self, name):
+        """Close the running phase under name and start timing the next one."""
+        now = time.perf_counter()
+        self.current[name] = now - self.phase_start
+        self.record(name, 'frame', self.phase_start, now)
+        self.phase_start = now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        self.current['frame'] = now - self.frame_start
+        self.frames.append(self.current)
+        self.record('frame', 'frame', self.frame_start, now)
+
+    def span(self, name, cat='app', **args):
+        return ProfileSpan(self, name, cat, args)
+
+    def record(self, name, cat, start, end, args=None):
+        thread = threading.current_thread()
+        if thread.ident not in self.thread_names:
+            self.thread_names[thread.ident] = thread.name
+        self.spans.append((name, cat, start, end, thread.ident, args))
+
+    def percentiles(self):
+        """Phase name -> (p50, p95, max) in milliseconds over the kept frames."""
+        samples = {}
+        for frame in list(self.frames):
+            for name, seconds in frame.items():
+                samples.setdefault(name, []).append(seconds * 1000)
+        summary = {}
+        for name, values in samples.items():
+            values.sort()
+            summary[name] = (values[len(values) // 2], values[min(len(values) - 1, int(len(values) * 0.95))], values[-1])
+        return summary
+
+    def draw_overlay(self, surface):
+        if not self.show_overlay:
+            return
+        if self.overlay_font is None:
+            self.overlay_font = pygame.font.Font(None, 24)
+        budget = 1000 / FRAME_RATE
+        lines = [(f"ms p50 / p95 / max ({len(self.frames)} frames)", WHITE)]
+        for name, (p50, p95, worst) in self.percentiles().items():
+            over = name != 'tick' and worst > budget
+            lines.append((f"{name}: {p50:.1f} / {p95:.1f} / {worst:.1f}", (255, 90, 90) if over else WHITE))
+        line_height = self.overlay_font.get_height()
+        # Rendered directly, the numbers change every frame and would only churn text_cache
+        surfaces = [self.overlay_font.render(text, True, color) for text, color in lines]
+        width = max(s.get_width() for s in surfaces) + 16
+        rect = pygame.Rect(SCREEN_WIDTH - width - 10, SCREEN_HEIGHT - len(surfaces) * line_height - 60,
+                           width, len(surfaces) * line_height + 12)
+        pygame.draw.rect(surface, BLACK, rect)
+        for index, text_surface in enumerate(surfaces):
+            surface.blit(text_surface, (rect.x + 8, rect.y + 6 + index * line_height))
+        dirty_regions.track(self, rect, tuple(text for text, _ in lines))
+
+    def export_trace(self, path=TRACE_PATH):
+        """Write the recorded spans as Chrome trace-event JSON."""
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                  for tid, name in list(self.thread_names.items())]
+        for name, cat, start, end, tid, args in list(self.spans):
+            event = {"name": name, "cat": cat, "ph": "X", "pid": 1, "tid": tid,
+                     "ts": round((start - self.origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1)}
+            if args:
+                event["args"] = args
+            events.append(event)
+        write_text_atomic(path, json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+        print(f"Wrote {len(events)} trace events to {path}")
+
+    def stats(self):
+        return {name: tuple(round(value, 2) for value in values) for name, values in self.percentiles().items()}
+
+frame_profiler = FrameProfiler()
+
+def profiled(name, cat='draw'):
+    """Decorator recording every call of a function as a profiler span."""
+    def wrap(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with frame_profiler.span(name, cat):
+                return func(*args, **kwargs)
+        return wrapper
+    return wrap
+
+def draw_loading_screen(screen, message, progress_message=None):
     """Display a loading screen with a custom message."""
     screen.fill(BLACK)
     draw_wrapped_text(screen, message, SCREEN_WIDTH // 2 - 300, SCREEN_HEIGHT // 2, font, WHITE, 600)
+    if progress_message:
+        progress_text = render_text(font, progress_message, True, WHITE)
+        screen.blit(progress_text, progress_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50)))
     pygame.display.flip()
 
+def wait_for_part(state, part):
+    """Block on one part file while keeping the window responsive; closing the window quits like the main loop does."""
+    loader = state.loader
+    while not loader.is_ready(part):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit_app(state)
+        total = len(loader.futures)
+        draw_loading_screen(screen, f"Loading {part}...", f"{loader.loaded_count()}/{total} files loaded")
+        clock.tick(30)
+    dirty_regions.mark_all()
+    return loader.result(part)
+
 # Initialize JSON files if missing or invalid
 def initialize_json_files():
     """Initialize JSON files for each subject part if missing or empty."""
@@ -152,26 +542,24 @@ def initialize_json_files():
         if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
             default_data = {
                 "sections": {
-                    "sectionA": {"section_name": "Section A", "questions": [], "aced_questions": []},
-                    "sectionB": {"section_name": "Section B", "questions": [], "aced_questions": []}
+                    "sectionA": {"section_name": "Section A", "questions": []},
+                    "sectionB": {"section_name": "Section B", "questions": []}
                 }
             }
             if part == "arithmetic1":  # Match example JSON structure
-                default_data["sections"]["sectionC"] = {"section_name": "Section C", "questions": [], "aced_questions": []}
+                default_data["sections"]["sectionC"] = {"section_name": "Section C", "questions": []}
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(default_data, f, indent=2)
                 print(f"Initialized {filepath} with default data")
 
 def load_json(filepath):
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
+        with frame_profiler.span("load_json", "io", path=filepath), open(filepath, 'r', encoding='utf-8') as f:
             content = f.read().strip()
             if not content or content in ['{}', '[]']:
                 print(f"{filepath} is empty or minimal, returning default")
                 return {"sections": {}}
             data = json.loads(content)
-            print(f"Loaded {filepath}:")
-            print(json.dumps(data, indent=2))
             return data
     except json.JSONDecodeError as e:
         print(f"Error loading {filepath}: Invalid JSON format - {str(e)}")
@@ -180,7 +568,1244 @@ def load_json(filepath):
         print(f"Warning: {filepath} not found. Returning default structure.")
         return {"sections": {}}
 
+def write_text_atomic(filepath, text):
+    """Write through a temp file and rename so a crash never leaves a truncated file."""
+    temp_path = f"{filepath}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, filepath)
+
+class PersistenceWorker:
+    """Background writer that coalesces repeated writes to a file and writes atomically.
+
+    Files are written in the order they were last replaced, so a progress snapshot always
+    lands before the journal truncation queued after it.
+    """
+    def __init__(self, debounce=PERSIST_DEBOUNCE, max_delay=PERSIST_MAX_DELAY):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.pending = OrderedDict()  # path -> {'ops': [(kind, text)], 'first': t, 'last': t}
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.thread = None
+        self.force = False
+        self.writing = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.total_write_ms = 0.0
+        self.max_write_ms = 0.0
+
+    def replace(self, path, text):
+        """Write text to path; text may be a callable, then it is built on the writer thread at write time."""
+        self.submit(path, ('replace', text))
+
+    def append(self, path, text):
+        self.submit(path, ('append', text))
+
+    def submit(self, path, op):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.pending.get(path)
+            if entry is None:
+                entry = self.pending[path] = {'ops': [], 'first': now}
+            else:
+                self.coalesced += 1
+            if op[0] == 'replace':
+                entry['ops'] = [op]  # A whole-file write supersedes anything queued before it
+                self.pending.move_to_end(path)
+            elif entry['ops'] and entry['ops'][-1][0] == 'append':
+                entry['ops'][-1] = ('append', entry['ops'][-1][1] + op[1])
+            else:
+                entry['ops'].append(op)
+            entry['last'] = now
+            self.changed.notify_all()
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name="persistence", daemon=True)
+            self.thread.start()
+
+    def due_at(self, entry):
+        return min(entry['last'] + self.debounce, entry['first'] + self.max_delay)
+
+    def take_due(self):
+        """Pop the leading run of entries that are due, keeping submission order."""
+        now = time.monotonic()
+        batch = []
+        while self.pending:
+            path, entry = next(iter(self.pending.items()))
+            if not self.force and self.due_at(entry) > now:
+                break
+            del self.pending[path]
+            batch.append((path, entry['ops']))
+        return batch
+
+    def run(self):
+        while True:
+            with self.lock:
+                batch = self.take_due()
+                while not batch:
+                    timeout = None
+                    if self.pending:
+                        timeout = max(0.0, self.due_at(next(iter(self.pending.values()))) - time.monotonic())
+                    self.changed.wait(timeout)
+                    batch = self.take_due()
+                self.writing += 1
+            try:
+                for path, ops in batch:
+                    self.write(path, ops)
+            finally:
+                with self.lock:
+                    self.writing -= 1
+                    self.changed.notify_all()
+
+    def write(self, path, ops):
+        start = time.perf_counter()
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)  # Profile folders are created on first write
+            for kind, text in ops:
+                if kind == 'replace':
+                    write_text_atomic(path, text() if callable(text) else text)
+                else:
+                    with open(path, 'a', encoding='utf-8') as f:
+                        f.write(text)
+                        f.flush()
+                        os.fsync(f.fileno())
+        except OSError as e:
+            self.errors += 1
+            print(f"Error writing {path}: {e}")
+        end = time.perf_counter()
+        frame_profiler.record("save", "io", start, end, {'path': path})
+        elapsed = (end - start) * 1000
+        self.writes += 1
+        self.total_write_ms += elapsed
+        self.max_write_ms = max(self.max_write_ms, elapsed)
+
+    def flush(self):
+        """Write everything queued now and wait for it, e.g. before quitting."""
+        with self.lock:
+            self.force = True
+            self.changed.notify_all()
+            while (self.pending or self.writing) and self.thread is not None and self.thread.is_alive():
+                self.changed.wait(0.1)
+            self.force = False
+
+    def stats(self):
+        with self.lock:
+            pending = len(self.pending) + self.writing
+        return {
+            'pending': pending,
+            'writes': self.writes,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'avg_write_ms': round(self.total_write_ms / self.writes, 2) if self.writes else 0.0,
+            'max_write_ms': round(self.max_write_ms, 2),
+        }
+
+persistence = PersistenceWorker()
+
+def profile_dir(data_dir=DATA_DIR, profile=None):
+    """Folder holding one profile's progress; the profile is resolved at call time so SAT_PROFILE can be set late."""
+    return os.path.join(data_dir, PROGRESS_DIR, profile or PROFILE)
+
+def adopt_legacy_file(legacy_path, path):
+    """Move a progress file older versions kept next to the part files into the profile folder."""
+    if not os.path.exists(path) and os.path.exists(legacy_path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(legacy_path, path)
+        print(f"Moved {legacy_path} to {path}")
+
+def profile_path(name, data_dir=DATA_DIR, profile=None):
+    path = os.path.join(profile_dir(data_dir, profile), name)
+    adopt_legacy_file(os.path.join(data_dir, name), path)
+    return path
+
+def apply_progress_record(progress, record):
+    """Apply one ace/unace record to a progress document; replaying a record twice is harmless."""
+    aced = progress.setdefault("aced", {}).setdefault(record['section'], {})
+    if record['op'] == 'ace':
+        aced.setdefault(record['id'], record.get('time'))
+    elif record['op'] == 'unace':
+        aced.pop(record['id'], None)
+
+def split_legacy_progress(data, progress):
+    """Move the aced copies older versions stored inside a part file into progress; True if data had any."""
+    found = False
+    for section_key, section in data.get("sections", {}).items():
+        if 'aced_questions' not in section:
+            continue
+        aced = progress.setdefault("aced", {}).setdefault(section_key, {})
+        for question in section.pop('aced_questions'):
+            if 'id' in question:
+                aced.setdefault(question['id'], None)
+        found = True
+    return found
+
+def attach_progress(data, progress, part=None):
+    """Give every section an aced_questions list, in the order they were aced, of the bank's own Question records.
+
+    Aced ids the bank no longer has stay in progress and are reported, they come back if the question does.
+    """
+    sections = data.setdefault("sections", {})
+    for section_key, aced in progress.get("aced", {}).items():
+        if aced and section_key not in sections:
+            sections[section_key] = {"section_name": section_key, "questions": []}
+    for section_key, section in sections.items():
+        aced = progress.get("aced", {}).get(section_key, {})
+        by_id = {q.id: q for q in section.get('questions', [])} if aced else {}
+        # Stable sort: ids split out of older part files have no time and keep their old order up front
+        ordered = sorted(aced, key=lambda question_id: aced[question_id] or 0)
+        section['aced_questions'] = [by_id[question_id] for question_id in ordered if question_id in by_id]
+        missing = [question_id for question_id in ordered if question_id not in by_id]
+        if missing:
+            print(f"Warning: {part or 'part'}/{section_key} has aced questions no longer in the bank: {', '.join(map(str, missing))}")
+    return data
+
+def bank_content(data):
+    """A part document as written to its shared file: plain question dicts and no aced lists."""
+    content = {"sections": {}}
+    for section_key, section in data.get("sections", {}).items():
+        stored = {k: v for k, v in section.items() if k != 'aced_questions'}
+        stored['questions'] = [q.to_dict() for q in section.get('questions', [])]
+        content["sections"][section_key] = stored
+    for key in data:
+        if key != "sections":
+            content[key] = data[key]
+    return content
+
+def progress_from_aced(data, previous=None):
+    """Progress document for a part's aced lists, keeping previous's ace times and its ids the bank no longer has."""
+    progress = {"aced": {}}
+    for section_key, section in data.get("sections", {}).items():
+        known = (previous or {}).get("aced", {}).get(section_key, {})
+        aced = {q.id: known.get(q.id) for q in section.get('aced_questions', []) if q.id is not None}
+        bank_ids = {q.id for q in section.get('questions', [])}
+        aced.update((question_id, aced_at) for question_id, aced_at in known.items() if question_id not in bank_ids)
+        if aced:
+            progress["aced"][section_key] = aced
+    return progress
+
+class ProgressJournal:
+    """Append-only log of ace/unace events per part, replayed over the profile's progress file on load.
+
+    Each line is "<crc32> <json>"; replay stops at the first torn or corrupt record.
+    """
+    def __init__(self, data_dir=DATA_DIR, profile=None):
+        self.data_dir = data_dir
+        self.profile = profile
+        self.record_counts = {}
+
+    def path(self, part):
+        return os.path.join(profile_dir(self.data_dir, self.profile), f"{part}.journal")
+
+    def progress_path(self, part):
+        return os.path.join(profile_dir(self.data_dir, self.profile), f"{part}.json")
+
+    @staticmethod
+    def encode(record):
+        payload = json.dumps(record, separators=(',', ':'))
+        return f"{zlib.crc32(payload.encode('utf-8')):08x} {payload}\n"
+
+    def append(self, part, record):
+        persistence.append(self.path(part), self.encode(record))
+        self.record_counts[part] = self.record_counts.get(part, 0) + 1
+
+    def read(self, part):
+        # Older journals lived next to the part file; their ace records also carry the question, which is ignored
+        adopt_legacy_file(os.path.join(self.data_dir, f"{part}.journal"), self.path(part))
+        records = []
+        good_bytes = 0
+        damaged = False
+        try:
+            with open(self.path(part), 'rb') as f:
+                for line_number, line in enumerate(f, 1):
+                    checksum, _, payload = line.rstrip(b'\n').partition(b' ')
+                    try:
+                        valid = line.endswith(b'\n') and int(checksum, 16) == zlib.crc32(payload)
+                        record = json.loads(payload.decode('utf-8')) if valid else None
+                    except ValueError:
+                        record = None
+                    if record is None:
+                        print(f"Journal {self.path(part)} is damaged at line {line_number}, ignoring the rest")
+                        damaged = True
+                        break
+                    records.append(record)
+                    good_bytes += len(line)
+            if damaged:
+                # Cut the torn tail so later appends are not hidden behind it
+                with open(self.path(part), 'r+b') as f:
+                    f.truncate(good_bytes)
+        except FileNotFoundError:
+            pass
+        self.record_counts[part] = len(records)
+        return records
+
+    def load_snapshot(self, part):
+        try:
+            with open(self.progress_path(part), 'r', encoding='utf-8') as f:
+                progress = json.load(f)
+        except FileNotFoundError:
+            return {"aced": {}}
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"Error reading {self.progress_path(part)}: {e}, starting from the journal alone")
+            return {"aced": {}}
+        progress.setdefault("aced", {})
+        return progress
+
+    def replay(self, part, progress):
+        for record in self.read(part):
+            apply_progress_record(progress, record)
+        return progress
+
+    def needs_compaction(self, part):
+        return self.record_counts.get(part, 0) >= JOURNAL_COMPACT_EVERY
+
+    def write_snapshot(self, part, progress):
+        """compact(), but written before returning instead of through the persistence worker."""
+        os.makedirs(os.path.dirname(self.progress_path(part)), exist_ok=True)
+        write_text_atomic(self.progress_path(part), json.dumps(progress, separators=(',', ':')))
+        write_text_atomic(self.path(part), "")
+        self.record_counts[part] = 0
+
+    def compact(self, part, progress):
+        """Fold the journal into the progress file, then start an empty journal."""
+        persistence.replace(self.progress_path(part), json.dumps(progress, separators=(',', ':')))
+        # Replaying old records over the new snapshot is idempotent, so a crash in between is safe
+        persistence.replace(self.path(part), "")
+        self.record_counts[part] = 0
+
+class JsonStore:
+    """Default storage: one shared JSON file per part in DATA_DIR, progress per profile under PROGRESS_DIR."""
+    def __init__(self, data_dir=DATA_DIR, profile=None):
+        self.data_dir = data_dir
+        self.journal = ProgressJournal(data_dir, profile)
+        self.progress = {}  # part -> {"aced": {section: {question id: ace time}}}
+
+    def initialize(self):
+        initialize_json_files()
+
+    def list_parts(self):
+        """Every part file on disk, so parts added by rename_tool.py show up next to SUBJECT_PARTS."""
+        if not os.path.isdir(self.data_dir):
+            return list(SUBJECT_PARTS)
+        return json_part_names(self.data_dir)
+
+    def load_part(self, part):
+        """Read a part file and attach the profile's progress, replaying its journal."""
+        path = os.path.join(self.data_dir, f"{part}.json")
+        data = load_json(path)
+        progress = self.journal.load_snapshot(part)
+        legacy = split_legacy_progress(data, progress)
+        intern_questions(data)
+        self.journal.replay(part, progress)
+        if legacy:
+            # The progress has to be on disk before the shared file loses its aced lists
+            try:
+                self.journal.write_snapshot(part, progress)
+            except OSError as e:
+                print(f"Error saving progress split out of {path}: {e}, keeping its aced lists for now")
+            else:
+                # Written once, from here on the part file only changes when its questions do
+                persistence.replace(path, json.dumps(bank_content(data), indent=2))
+        self.progress[part] = progress
+        return attach_progress(data, progress, part)
+
+    def record_progress(self, part, record, data):
+        progress = self.progress.setdefault(part, {"aced": {}})
+        apply_progress_record(progress, record)
+        self.journal.append(part, record)
+        if self.journal.needs_compaction(part):
+            self.journal.compact(part, progress)
+
+    def save_part(self, part, data):
+        """Write a part's questions to the shared file and its aced lists to the profile's progress."""
+        persistence.replace(os.path.join(self.data_dir, f"{part}.json"), json.dumps(bank_content(data), indent=2))
+        self.progress[part] = progress_from_aced(data, self.progress.get(part))
+        self.journal.compact(part, self.progress[part])
+
+    def close(self, all_data):
+        for part in all_data:
+            if self.journal.record_counts.get(part):
+                self.journal.compact(part, self.progress.get(part, {"aced": {}}))
+        persistence.flush()
+
+QUESTION_FIELDS = ('id', 'image', 'answer', 'answer_sheet', 'tags')
+TAG_TABLE = {}  # One shared tuple per distinct tag list across every loaded bank
+
+def intern_tags(tags):
+    tags = tuple(sys.intern(str(tag)) for tag in tags)
+    return TAG_TABLE.setdefault(tags, tags)
+
+def intern_text(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Question:
+    """One bank question; paths, answers and tags are interned and the section is a reference, not a copied name.
+
+    Part files keep the plain dict form, to_dict() rebuilds it when a part is saved.
+    """
+    __slots__ = ('id', 'image', 'answer', 'answer_sheet', 'tags', 'section', 'extra')
+
+    def __init__(self, id, image=None, answer=None, answer_sheet=None, tags=None, section=None, extra=None):
+        self.id = id
+        self.image = image
+        self.answer = answer
+        self.answer_sheet = answer_sheet
+        self.tags = tags  # Shared tuple from intern_tags, None if the bank gives no tags
+        self.section = section  # The section dict this question is listed in
+        self.extra = extra  # Fields this version does not know, written back unchanged
+
+    @classmethod
+    def from_dict(cls, data, section=None):
+        extra = {k: v for k, v in data.items() if k not in QUESTION_FIELDS and k != 'section_name'}
+        tags = data.get('tags')
+        return cls(data.get('id'), intern_text(data.get('image')), intern_text(data.get('answer')),
+                   intern_text(data.get('answer_sheet')), intern_tags(tags) if tags is not None else None,
+                   section, extra or None)
+
+    @property
+    def section_name(self):
+        return self.section.get("section_name") if self.section is not None else None
+
+    def to_dict(self):
+        data = {}
+        for field in ('id', 'image', 'answer', 'answer_sheet'):
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        if self.tags is not None:
+            data['tags'] = list(self.tags)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+def intern_questions(data):
+    """Replace a freshly loaded part's question dicts with Question records."""
+    for section in data.get("sections", {}).values():
+        section['questions'] = [Question.from_dict(q, section) for q in section.get('questions', [])]
+    return data
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    part_id INTEGER NOT NULL REFERENCES parts(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    UNIQUE (part_id, key)
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    section_id INTEGER NOT NULL REFERENCES sections(id) ON DELETE CASCADE,
+    question_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    image TEXT,
+    answer TEXT,
+    answer_sheet TEXT,
+    extra TEXT,
+    UNIQUE (section_id, question_id)
+);
+CREATE TABLE IF NOT EXISTS tags (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS question_tags (
+    question_row INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    tag_id INTEGER NOT NULL REFERENCES tags(id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (question_row, position)
+);
+CREATE TABLE IF NOT EXISTS aced (
+    section_id INTEGER NOT NULL REFERENCES sections(id) ON DELETE CASCADE,
+    question_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    aced_at REAL,
+    PRIMARY KEY (section_id, question_id)
+);
+CREATE INDEX IF NOT EXISTS idx_sections_part ON sections(part_id, position);
+CREATE INDEX IF NOT EXISTS idx_questions_section ON questions(section_id, position);
+CREATE INDEX IF NOT EXISTS idx_question_tags_tag ON question_tags(tag_id);
+CREATE INDEX IF NOT EXISTS idx_aced_section ON aced(section_id, position);
+"""
+
+class SqliteStore:
+    """Question banks and aced state in one SQLite database (WAL mode, one connection per thread).
+
+    Aced rows only point at question ids, but the database still holds a single profile's progress.
+    Progress records are committed on a writer thread; reads and whole-part saves wait for it first.
+    """
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self.local = threading.local()
+        self.writes = queue.Queue()  # (part, record) waiting for the writer, None stops it
+        self.writer = None
+        self.commits = 0
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self.local.conn = conn
+        return conn
+
+    def initialize(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = self.connection()
+        conn.executescript(SQLITE_SCHEMA)
+        conn.commit()
+
+    def list_parts(self):
+        return [row[0] for row in self.connection().execute("SELECT name FROM parts ORDER BY position")]
+
+    def part_id(self, conn, part, create=False):
+        row = conn.execute("SELECT id FROM parts WHERE name = ?", (part,)).fetchone()
+        if row:
+            return row[0]
+        if not create:
+            return None
+        position = conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM parts").fetchone()[0]
+        return conn.execute("INSERT INTO parts (name, position) VALUES (?, ?)", (part, position)).lastrowid
+
+    def section_id(self, conn, part, section):
+        part_id = self.part_id(conn, part, create=True)
+        row = conn.execute("SELECT id FROM sections WHERE part_id = ? AND key = ?", (part_id, section)).fetchone()
+        if row:
+            return row[0]
+        position = conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM sections WHERE part_id = ?", (part_id,)).fetchone()[0]
+        return conn.execute("INSERT INTO sections (part_id, key, name, position) VALUES (?, ?, ?, ?)",
+                            (part_id, section, section, position)).lastrowid
+
+    def load_part(self, part):
+        self.writes.join()
+        conn = self.connection()
+        part_row = conn.execute("SELECT id, extra FROM parts WHERE name = ?", (part,)).fetchone()
+        if part_row is None:
+            print(f"Warning: {part} not found in {self.path}. Returning default structure.")
+            return {"sections": {}}
+        part_id, part_extra = part_row
+        data = json.loads(part_extra) if part_extra else {}
+        data["sections"] = {}
+        section_keys = {}
+        for section_id, key, name in conn.execute(
+                "SELECT id, key, name FROM sections WHERE part_id = ? ORDER BY position", (part_id,)):
+            data["sections"][key] = {"section_name": name, "questions": [], "aced_questions": []}
+            section_keys[section_id] = key
+        tags = {}
+        for question_row, tag in conn.execute(
+                "SELECT qt.question_row, t.name FROM question_tags qt JOIN tags t ON t.id = qt.tag_id "
+                "JOIN questions q ON q.id = qt.question_row JOIN sections s ON s.id = q.section_id "
+                "WHERE s.part_id = ? ORDER BY qt.question_row, qt.position", (part_id,)):
+            tags.setdefault(question_row, []).append(tag)
+        for question_row, section_id, question_id, image, answer, answer_sheet, extra in conn.execute(
+                "SELECT q.id, q.section_id, q.question_id, q.image, q.answer, q.answer_sheet, q.extra "
+                "FROM questions q JOIN sections s ON s.id = q.section_id "
+                "WHERE s.part_id = ? ORDER BY s.position, q.position", (part_id,)):
+            section = data["sections"][section_keys[section_id]]
+            section["questions"].append(Question(
+                question_id, intern_text(image), intern_text(answer), intern_text(answer_sheet),
+                intern_tags(tags[question_row]) if question_row in tags else None, section,
+                json.loads(extra) if extra else None))
+        by_id = {}
+        for section_id, question_id, question_data in conn.execute(
+                "SELECT a.section_id, a.question_id, a.data FROM aced a JOIN sections s ON s.id = a.section_id "
+                "WHERE s.part_id = ? ORDER BY a.position", (part_id,)):
+            section = data["sections"][section_keys[section_id]]
+            if section_id not in by_id:
+                by_id[section_id] = {q.id: q for q in section["questions"]}
+            question = by_id[section_id].get(question_id)
+            if question is None and question_data != '{}':
+                question = Question.from_dict(json.loads(question_data), section)  # Rows written before aced entries became references
+            if question is not None:
+                section["aced_questions"].append(question)
+        return data
+
+    def record_progress(self, part, record, data):
+        self.writes.put((part, record))
+        if self.writer is None or not self.writer.is_alive():
+            self.writer = threading.Thread(target=self.run, name="sqlite-writer", daemon=True)
+            self.writer.start()
+
+    def apply_progress(self, conn, part, record):
+        section_id = self.section_id(conn, part, record['section'])
+        if record['op'] == 'ace':
+            position = conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM aced WHERE section_id = ?",
+                                    (section_id,)).fetchone()[0]
+            conn.execute("INSERT OR IGNORE INTO aced (section_id, question_id, position, data, aced_at) VALUES (?, ?, ?, ?, ?)",
+                         (section_id, record['id'], position, '{}', record.get('time')))
+        elif record['op'] == 'unace':
+            conn.execute("DELETE FROM aced WHERE section_id = ? AND question_id = ?", (section_id, record['id']))
+
+    def run(self):
+        while True:
+            batch = [self.writes.get()]
+            while not self.writes.empty():
+                batch.append(self.writes.get())  # Everything queued meanwhile goes into the same transaction
+            jobs = [job for job in batch if job is not None]
+            try:
+                if jobs:
+                    conn = self.connection()
+                    with conn:
+                        for part, record in jobs:
+                            self.apply_progress(conn, part, record)
+                    self.commits += 1
+            except sqlite3.Error as e:
+                print(f"Error saving progress to {self.path}: {e}")
+            finally:
+                for _ in batch:
+                    self.writes.task_done()
+            if None in batch:
+                conn = getattr(self.local, 'conn', None)
+                if conn is not None:
+                    conn.close()
+                    self.local.conn = None
+                return
+
+    def save_part(self, part, data):
+        """Replace everything stored for part with data."""
+        self.writes.join()
+        conn = self.connection()
+        with conn:
+            part_id = self.part_id(conn, part, create=True)
+            extra = {k: v for k, v in data.items() if k != "sections"}
+            conn.execute("UPDATE parts SET extra = ? WHERE id = ?", (json.dumps(extra) if extra else None, part_id))
+            conn.execute("DELETE FROM sections WHERE part_id = ?", (part_id,))
+            for section_position, (key, section) in enumerate(data.get("sections", {}).items()):
+                section_id = conn.execute("INSERT INTO sections (part_id, key, name, position) VALUES (?, ?, ?, ?)",
+                                          (part_id, key, section.get("section_name", key), section_position)).lastrowid
+                for position, question in enumerate(section.get("questions", [])):
+                    question_row = conn.execute(
+                        "INSERT OR REPLACE INTO questions (section_id, question_id, position, image, answer, answer_sheet, extra) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (section_id, question.id, position, question.image, question.answer,
+                         question.answer_sheet, json.dumps(question.extra) if question.extra else None)).lastrowid
+                    for tag_position, tag in enumerate(question.tags or ()):
+                        conn.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (tag,))
+                        conn.execute("INSERT INTO question_tags (question_row, tag_id, position) "
+                                     "SELECT ?, id, ? FROM tags WHERE name = ?", (question_row, tag_position, tag))
+                for position, question in enumerate(section.get("aced_questions", [])):
+                    conn.execute("INSERT OR IGNORE INTO aced (section_id, question_id, position, data) VALUES (?, ?, ?, ?)",
+                                 (section_id, question.id, position, '{}'))
+
+    def close(self, all_data):
+        if self.writer is not None and self.writer.is_alive():
+            self.writes.put(None)
+            self.writer.join()
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+def json_part_names(data_dir=DATA_DIR):
+    """Every part file in data_dir, in SUBJECT_PARTS order first, then alphabetically."""
+    names = sorted(name[:-5] for name in os.listdir(data_dir)
+                   if name.endswith(".json") and name not in ("settings.json", SCHEDULE_FILE, SESSION_FILE))
+    return [p for p in SUBJECT_PARTS if p in names] + [p for p in names if p not in SUBJECT_PARTS]
+
+def import_json_to_sqlite(data_dir=DATA_DIR, db_path=SQLITE_PATH):
+    json_store = JsonStore(data_dir)
+    sqlite_store = SqliteStore(db_path)
+    sqlite_store.initialize()
+    for part in json_part_names(data_dir):
+        start = time.perf_counter()
+        data = json_store.load_part(part)  # Includes journaled progress not yet compacted
+        sqlite_store.save_part(part, data)
+        count = sum(len(section.get("questions", [])) for section in data.get("sections", {}).values())
+        print(f"Imported {part}: {count} questions in {(time.perf_counter() - start) * 1000:.1f} ms")
+    persistence.flush()  # Loading may have split progress out of older part files
+    sqlite_store.close(None)
+
+def split_progress_files(data_dir=DATA_DIR, profile=None):
+    """Move aced lists, journals, schedule and session out of data_dir into profile's progress folder."""
+    json_store = JsonStore(data_dir, profile)
+    for name in (SCHEDULE_FILE, SESSION_FILE):
+        profile_path(name, data_dir, profile)
+    for part in json_part_names(data_dir):
+        data = json_store.load_part(part)  # Splits a part file that still holds aced copies
+        count = sum(len(section.get("aced_questions", [])) for section in data.get("sections", {}).values())
+        print(f"{part}: {count} aced questions in {json_store.journal.progress_path(part)}")
+    persistence.flush()
+
+def export_sqlite_to_json(data_dir=DATA_DIR, db_path=SQLITE_PATH):
+    sqlite_store = SqliteStore(db_path)
+    sqlite_store.initialize()
+    json_store = JsonStore(data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+    for part in sqlite_store.list_parts():
+        json_store.save_part(part, sqlite_store.load_part(part))  # Also empties the profile's journal for part
+        print(f"Exported {part} to {data_dir}")
+    persistence.flush()
+    sqlite_store.close(None)
+
+def storage_command(argv):
+    parser = argparse.ArgumentParser(prog="Main.py", description="Move question banks between JSON files and SQLite, pre-scale their images, check their answers or split progress out of older part files.")
+    parser.add_argument("command", choices=["import-json", "export-json", "warm-images", "validate", "split-progress"])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--profile", help=f"Progress profile for split-progress (SAT_PROFILE, currently {PROFILE})")
+    parser.add_argument("--db", default=SQLITE_PATH)
+    parser.add_argument("--workers", type=int, help="Processes for warm-images (CPU count by default)")
+    args = parser.parse_args(argv)
+    if args.command == "import-json":
+        import_json_to_sqlite(args.data_dir, args.db)
+    elif args.command == "export-json":
+        export_sqlite_to_json(args.data_dir, args.db)
+    elif args.command == "warm-images":
+        warm_derived_images(args.workers)
+    elif args.command == "split-progress":
+        split_progress_files(args.data_dir, args.profile)
+    else:
+        return 1 if validate_bank() else 0
+    return 0
+
+storage = SqliteStore() if STORAGE_BACKEND == "sqlite" else JsonStore()
+
+class PartLoader:
+    """Parses every part file on a thread pool so the menu never waits on the disk."""
+    def __init__(self, parts, workers=LOADER_WORKERS):
+        self.parts = list(parts)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="part-loader")
+        self.futures = {}
+        self.timings = {}
+
+    def start(self):
+        for part in self.parts:
+            if part not in self.futures:
+                self.futures[part] = self.executor.submit(self.load, part)
+
+    def load(self, part):
+        start = time.perf_counter()
+        data = storage.load_part(part)
+        end = time.perf_counter()
+        frame_profiler.record("load_part", "io", start, end, {'part': part})
+        elapsed = (end - start) * 1000
+        self.timings[part] = elapsed  # Reported on quit, printing here would interleave threads
+        return data
+
+    def is_ready(self, part):
+        future = self.futures.get(part)
+        return future is not None and future.done()
+
+    def loaded_count(self):
+        return sum(1 for future in self.futures.values() if future.done())
+
+    def result(self, part):
+        if part not in self.futures:
+            self.futures[part] = self.executor.submit(self.load, part)
+        return self.futures[part].result()
+
+# Every (size, width, upscale) the screens ask image_cache for, by question field
+IMAGE_VARIANTS = {
+    'image': [(None, 500, False), ((500, 500), None, True), ((600, 400), None, True)],
+    'answer_sheet': [(None, 500, True)],
+}
+PREVIEW_VARIANT = ("Meshes/answer_sheet.png", (290, 290), None, True)
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def trim_margins(image):
+    """Crop near-white borders, keeping TRIM_PADDING pixels around the content."""
+    mask = pygame.mask.from_threshold(image, WHITE, (TRIM_THRESHOLD, TRIM_THRESHOLD, TRIM_THRESHOLD, 255))
+    mask.invert()
+    # Surface.get_bounding_rect works on alpha, so paint the content mask into an alpha channel
+    bounds = mask.to_surface(setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 0)).get_bounding_rect()
+    if not bounds.width or not bounds.height:
+        return image
+    bounds = bounds.inflate(TRIM_PADDING * 2, TRIM_PADDING * 2).clip(image.get_rect())
+    if bounds.size == image.get_size():
+        return image
+    return image.subsurface(bounds).copy()
+
+def derive_image(path, size=None, width=None, upscale=True):
+    """Decode and scale path; width-scaled variants keep their aspect ratio, so they are trimmed first."""
+    image = pygame.image.load(path)
+    if size:
+        if image.get_size() != size:
+            image = pygame.transform.scale(image, size)
+    elif width:
+        image = trim_margins(image)
+        orig_width, orig_height = image.get_size()
+        if orig_width != width and (upscale or orig_width > width):
+            image = pygame.transform.scale(image, (width, int(orig_height * width / orig_width)))
+    return image
+
+def save_image_atomic(surface, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.png"  # pygame picks the format from the extension
+    pygame.image.save(surface, temp_path)
+    os.replace(temp_path, path)
+
+def derive_variants(path, targets):
+    """Write every missing (target path, size, width, upscale) variant of path; runs in warm-images workers."""
+    written = 0
+    for target, size, width, upscale in targets:
+        if os.path.exists(target):
+            continue
+        save_image_atomic(derive_image(path, size, width, upscale), target)
+        written += 1
+    return written
+
+class DerivedImageCache:
+    """Pre-scaled variants of source images on disk, keyed by source content hash and target size.
+
+    Source hashes are remembered by (mtime, size) in index.json so an unchanged file is
+    never reread; a changed file gets a new hash and its variants are derived again.
+    A miss returns the freshly derived image right away; hashing the source and writing
+    the variant and the index happen on a writer thread.
+    """
+    def __init__(self, root=DERIVED_IMAGE_DIR):
+        self.root = root
+        self.index = None  # source path -> [mtime_ns, size, sha1]
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.jobs = queue.Queue()  # (path, size, width, upscale, image) variants to write
+        self.thread = None
+
+    def index_path(self):
+        return os.path.join(self.root, "index.json")
+
+    def load_index(self):
+        if self.index is None:
+            try:
+                with open(self.index_path(), 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.index = {}
+        return self.index
+
+    def known_hash(self, path):
+        """The remembered hash of path if the file is unchanged, else None; never reads the file."""
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.load_index().get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        return None
+
+    def source_hash(self, path, save=True):
+        digest = self.known_hash(path)
+        if digest:
+            return digest
+        stat = os.stat(path)
+        digest = file_hash(path)
+        with self.lock:
+            self.index[path] = [stat.st_mtime_ns, stat.st_size, digest]
+        if save:
+            self.save_index()
+        return digest
+
+    def index_text(self):
+        with self.lock:
+            return json.dumps(self.index)
+
+    def save_index(self):
+        persistence.replace(self.index_path(), self.index_text)  # Encoded when the debounced write lands
+
+    def variant_path(self, digest, size=None, width=None, upscale=True):
+        if size:
+            name = f"{size[0]}x{size[1]}"
+        else:
+            name = f"w{width}{'u' if upscale else ''}t"
+        return os.path.join(self.root, digest[:2], f"{digest}_{name}.png")
+
+    def load(self, path, size=None, width=None, upscale=True):
+        if not size and not width:
+            return pygame.image.load(path)
+        digest = self.known_hash(path)
+        if digest:
+            try:
+                image = pygame.image.load(self.variant_path(digest, size, width, upscale))
+                self.hits += 1
+                return image
+            except (FileNotFoundError, pygame.error):
+                pass  # Not derived yet, or a damaged variant that gets rewritten
+        self.misses += 1
+        image = derive_image(path, size, width, upscale)
+        self.jobs.put((path, size, width, upscale, image.copy()))  # The caller goes on to convert its own copy
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name="derived-images", daemon=True)
+            self.thread.start()
+        return image
+
+    def run(self):
+        changed = False
+        while True:
+            path, size, width, upscale, image = self.jobs.get()
+            try:
+                known = self.known_hash(path)
+                digest = known or self.source_hash(path, save=False)
+                changed = changed or not known
+                target = self.variant_path(digest, size, width, upscale)
+                if known or not os.path.exists(target):  # A known hash with a miss means a damaged variant
+                    with frame_profiler.span("derive_save", "io", path=path):
+                        save_image_atomic(image, target)
+            except FileNotFoundError:
+                pass  # Source removed since it was derived, nothing to cache
+            except (OSError, pygame.error) as e:
+                print(f"Error caching {path} variant: {e}")
+            if changed and self.jobs.empty():
+                self.save_index()  # Once per burst of misses, not per new hash
+                changed = False
+            self.jobs.task_done()
+
+    def flush(self):
+        """Wait until every queued variant is written and the index save is queued."""
+        self.jobs.join()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+derived_images = DerivedImageCache()
+
+def referenced_images(parts):
+    """Source path -> set of (size, width, upscale) variants the screens will ask for."""
+    wanted = {}
+    for part in parts:
+        for section in storage.load_part(part).get("sections", {}).values():
+            for question in section.get("questions", []) + section.get("aced_questions", []):
+                for field, variants in IMAGE_VARIANTS.items():
+                    path = getattr(question, field)
+                    if path:
+                        wanted.setdefault(path, set()).update(variants)
+    path, size, width, upscale = PREVIEW_VARIANT
+    wanted.setdefault(path, set()).add((size, width, upscale))
+    return wanted
+
+def warm_derived_images(workers=None):
+    """Derive every variant referenced by the question banks on a process pool."""
+    start = time.perf_counter()
+    wanted = referenced_images(storage.list_parts())
+    jobs = []
+    for path, variants in wanted.items():
+        if not os.path.exists(path):
+            print(f"Warning: {path} not found, skipping")
+            continue
+        digest = derived_images.source_hash(path, save=False)
+        targets = [(derived_images.variant_path(digest, size, width, upscale), size, width, upscale)
+                   for size, width, upscale in sorted(variants, key=repr)]
+        jobs.append((path, targets))
+    derived_images.save_index()
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(derive_variants, path, targets): path for path, targets in jobs}
+        for future, path in futures.items():
+            try:
+                written += future.result()
+            except Exception as e:
+                print(f"Error deriving {path}: {e}")
+    persistence.flush()
+    print(f"Derived {written} image variants for {len(jobs)} images in {time.perf_counter() - start:.1f}s")
+
+class ImageCache:
+    """LRU cache of decoded, display-format surfaces keyed by path, target size and mtime.
+
+    mtimes are remembered per path and only checked again on a miss or after invalidate().
+    """
+    def __init__(self, max_bytes=IMAGE_CACHE_BUDGET):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.mtimes = {}  # path -> mtime the cached variants were decoded from
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetch_hits = 0
+        self.prefetched = {}  # Raw surfaces from the prefetcher, not yet display-converted
+        self.in_flight = None
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+
+    def get(self, path, size=None, width=None, upscale=True):
+        """Return the image at path scaled to size, or to width keeping the aspect ratio.
+
+        Raises the load error so callers can keep their own fallbacks.
+        """
+        key = self.make_key(path, size, width, upscale)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+        key = self.make_key(path, size, width, upscale, refresh=True)  # The file may have changed since it was first seen
+        image = self.take_prefetched(key)
+        if image is not None:
+            self.prefetch_hits += 1
+        else:
+            self.misses += 1
+            image = self.load_scaled(path, size, width, upscale)
+        image = image.convert_alpha() if image.get_alpha() is not None else image.convert()
+        self.put(key, image)
+        return image
+
+    def has(self, path, size=None, width=None, upscale=True):
+        """True when get() would not have to decode."""
+        try:
+            key = self.make_key(path, size, width, upscale)
+        except OSError:
+            return False
+        return key in self.entries or key in self.prefetched
+
+    def make_key(self, path, size=None, width=None, upscale=True, refresh=False):
+        mtime = None if refresh else self.mtimes.get(path)
+        if mtime is None:
+            mtime = self.mtimes[path] = os.path.getmtime(path)
+        return (path, size, width, upscale, mtime)
+
+    def invalidate(self, path=None):
+        """Check path (or every path) on disk again the next time it is drawn."""
+        if path is None:
+            self.mtimes.clear()
+        else:
+            self.mtimes.pop(path, None)
+
+    @staticmethod
+    def load_scaled(path, size=None, width=None, upscale=True):
+        """Decode and scale without touching the display, so worker threads can call it."""
+        with frame_profiler.span("image_load", "io", path=path):
+            if DERIVED_IMAGES:
+                return derived_images.load(path, size, width, upscale)
+            return derive_image(path, size, width, upscale)
+
+    def offer(self, key, image):
+        """Hand over a surface decoded off the main thread; converted lazily on first use."""
+        with self.lock:
+            self.prefetched[key] = image
+            self.ready.notify_all()
+
+    def take_prefetched(self, key):
+        with self.lock:
+            # If a worker is decoding this exact image right now, wait for it instead of decoding twice
+            while key == self.in_flight:
+                self.ready.wait(0.5)
+            return self.prefetched.pop(key, None)
+
+    def drop_prefetched(self, keep=()):
+        """Forget prefetched surfaces except those whose (path, size, width, upscale) is in keep."""
+        with self.lock:
+            for key in [k for k in self.prefetched if k[:4] not in keep]:
+                del self.prefetched[key]
+
+    def put(self, key, surface):
+        # Drop older variants of the same file/size so a changed mtime does not leak memory
+        for old_key in [k for k in self.entries if k[:4] == key[:4] and k != key]:
+            self.discard(old_key)
+        if key in self.entries:
+            self.discard(key)
+        self.entries[key] = surface
+        self.used_bytes += self.surface_bytes(surface)
+        while self.used_bytes > self.max_bytes and len(self.entries) > 1:
+            oldest_key = next(iter(self.entries))
+            self.discard(oldest_key)
+            self.evictions += 1
+
+    def discard(self, key):
+        surface = self.entries.pop(key, None)
+        if surface is not None:
+            self.used_bytes -= self.surface_bytes(surface)
+
+    def clear(self):
+        self.entries.clear()
+        self.mtimes.clear()
+        self.used_bytes = 0
+
+    @staticmethod
+    def surface_bytes(surface):
+        return surface.get_pitch() * surface.get_height()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'prefetch_hits': self.prefetch_hits,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.used_bytes,
+            'budget': self.max_bytes,
+        }
+
+image_cache = ImageCache()
+
+class ImagePrefetcher:
+    """Decodes and pre-scales upcoming images on a worker thread and feeds them to image_cache."""
+    def __init__(self, cache):
+        self.cache = cache
+        self.jobs = queue.Queue()
+        self.generation = 0
+        self.thread = None
+
+    def schedule(self, requests):
+        """Replace pending work with requests, a list of (path, size, width, upscale) tuples."""
+        self.generation += 1
+        wanted = set()
+        for request in requests:
+            self.jobs.put((self.generation, request))
+            wanted.add(request)
+        self.cache.drop_prefetched(keep=wanted)
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name="image-prefetch", daemon=True)
+            self.thread.start()
+
+    def cancel(self):
+        self.generation += 1
+        self.cache.drop_prefetched()
+
+    def run(self):
+        while True:
+            generation, (path, size, width, upscale) = self.jobs.get()
+            if generation != self.generation:
+                continue  # Cancelled, the user moved on
+            try:
+                key = self.cache.make_key(path, size, width, upscale)
+                if key in self.cache.entries or key in self.cache.prefetched:
+                    continue
+                with self.cache.lock:
+                    self.cache.in_flight = key
+                image = self.cache.load_scaled(path, size, width, upscale)
+                if generation == self.generation:
+                    self.cache.offer(key, image)
+            except FileNotFoundError:
+                pass  # Reported by the screen that draws it
+            except Exception as e:
+                print(f"Prefetch error for {path}: {e}")
+            finally:
+                with self.cache.lock:
+                    self.cache.in_flight = None
+                    self.cache.ready.notify_all()
+
+image_prefetcher = ImagePrefetcher(image_cache)
+
+def prefetch_questions(questions, start_index, wrap=True):
+    """Queue the current question's images and the ones that follow it in session order."""
+    requests = []
+    count = len(questions)
+    for offset in range(min(PREFETCH_AHEAD, count - 1) + 1):
+        index = start_index + offset
+        if index >= count:
+            if not wrap:
+                break
+            index %= count
+        question = questions[index]
+        if question.image:
+            requests.append((question.image, None, 500, False))
+    image_prefetcher.schedule(requests)  # Answer sheets stream in through TiledSheet once a preview is shown
+
+class ThumbnailAtlas:
+    """Small thumbnails decoded on a worker thread and packed into one atlas surface.
+
+    The worker only decodes; pump() copies finished thumbnails into the atlas on the main
+    thread, reusing the least recently used slot once the atlas is full.
+    """
+    def __init__(self, size=THUMB_SIZE, capacity=THUMB_ATLAS_SLOTS, columns=32):
+        self.size = size
+        self.capacity = capacity
+        self.columns = columns
+        self.surface = None
+        self.slots = OrderedDict()  # path -> slot number
+        self.failed = set()
+        self.jobs = queue.Queue()
+        self.done = queue.Queue()
+        self.generation = 0
+        self.thread = None
+        self.generated = 0
+        self.last_placeholder = (None, None, None)
+
+    def request(self, paths):
+        """Queue thumbnails for paths in order, dropping requests that are still waiting."""
+        self.generation += 1
+        for path in dict.fromkeys(paths):
+            if path not in self.slots and path not in self.failed:
+                self.jobs.put((self.generation, path))
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name="thumbnails", daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            generation, path = self.jobs.get()
+            if generation != self.generation or path in self.slots:
+                continue
+            try:
+                image = ImageCache.load_scaled(path, size=(500, 500))  # Also warms the aced view's own variant
+                if image.get_bitsize() < 24:
+                    promoted = pygame.Surface(image.get_size(), 0, 32)
+                    promoted.blit(image, (0, 0))
+                    image = promoted
+                self.done.put((path, pygame.transform.smoothscale(image, self.size)))
+            except FileNotFoundError:
+                self.done.put((path, None))
+            except Exception as e:
+                print(f"Thumbnail error for {path}: {e}")
+                self.done.put((path, None))
+
+    def pump(self):
+        """Move finished thumbnails into the atlas; call once per frame from the main thread."""
+        while True:
+            try:
+                path, image = self.done.get_nowait()
+            except queue.Empty:
+                return
+            if image is None:
+                self.failed.add(path)
+                continue
+            if self.surface is None:
+                rows = (self.capacity + self.columns - 1) // self.columns
+                self.surface = pygame.Surface((self.columns * self.size[0], rows * self.size[1]), 0, 32)  # smoothscale needs 24 or 32 bits
+            if path in self.slots:
+                slot = self.slots[path]
+            elif len(self.slots) < self.capacity:
+                slot = len(self.slots)
+            else:
+                _, slot = self.slots.popitem(last=False)
+            self.slots[path] = slot
+            self.surface.blit(image, self.slot_rect(slot))
+            self.generated += 1
+
+    def slot_rect(self, slot):
+        row, col = divmod(slot, self.columns)
+        return pygame.Rect(col * self.size[0], row * self.size[1], self.size[0], self.size[1])
+
+    def area(self, path):
+        """Atlas rect holding path's thumbnail, or None while it is not decoded yet."""
+        slot = self.slots.get(path)
+        if slot is None:
+            return None
+        self.slots.move_to_end(path)
+        return self.slot_rect(slot)
+
+    def placeholder(self, path, size):
+        """path's thumbnail scaled up to size, kept for the last path asked for."""
+        if self.last_placeholder[:2] == (path, size):
+            return self.last_placeholder[2]
+        area = self.area(path)
+        if area is None:
+            return None
+        image = pygame.transform.smoothscale(self.surface.subsurface(area), size)
+        self.last_placeholder = (path, size, image)
+        return image
+
+    def stats(self):
+        return {'generated': self.generated, 'resident': len(self.slots), 'failed': len(self.failed)}
+
+thumbnails = ThumbnailAtlas()
+
 class InputBox:
+    wants_keys = True
+
     def __init__(self, x, y, width, height):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = ""
@@ -202,18 +1827,27 @@ class InputBox:
                 if font.size(temp_text)[0] <= self.max_width:
                     self.text = temp_text
 
+    def blur(self):
+        self.active = False
+
     def draw(self, screen):
         border_color = (0, 0, 255) if self.active else (0, 0, 0)
         pygame.draw.rect(screen, (255, 255, 255), self.rect)
         pygame.draw.rect(screen, border_color, self.rect, 2)
-        text_surf = font.render(self.text, True, (0, 0, 0))
-        if text_surf.get_width() > self.max_width:
-            for i in range(len(self.text), -1, -1):
-                clipped_text = self.text[:i]
-                if font.size(clipped_text)[0] <= self.max_width:
-                    text_surf = font.render(clipped_text, True, (0, 0, 0))
-                    break
+        text = self.text
+        if font.size(text)[0] > self.max_width:
+            # Binary search the longest prefix that fits instead of trying every length
+            low, high = 0, len(text)
+            while low < high:
+                mid = (low + high + 1) // 2
+                if font.size(text[:mid])[0] <= self.max_width:
+                    low = mid
+                else:
+                    high = mid - 1
+            text = text[:low]
+        text_surf = render_text(font, text, True, (0, 0, 0))
         screen.blit(text_surf, (self.rect.x + 5, self.rect.y + 5))
+        dirty_regions.track(self, self.rect, (text, self.active))
 
 class ProgressBar:
     def __init__(self, x, y, width, height):
@@ -250,6 +1884,7 @@ class ProgressBar:
         pygame.draw.rect(surface, GRAY, (self.x, self.y, self.width, self.height))
         fill_width = int(self.width * self.current_progress)
         pygame.draw.rect(surface, PROGRESS_BAR_COLOR, (self.x, self.y, fill_width, self.height))
+        dirty_regions.track(self, (self.x, self.y, self.width, self.height), fill_width)
 
 class AnswerAnimation:
     def __init__(self):
@@ -275,8 +1910,97 @@ class AnswerAnimation:
 
     def draw_animation(self, screen):
         color = (0, 255, 0) if "Correct" in self.message else (255, 0, 0)
-        text_surf = font.render(f"{self.message}", True, color)
-        screen.blit(text_surf, (SCREEN_WIDTH // 2 - text_surf.get_width() // 2, self.y_pos))
+        text_surf = render_text(font, f"{self.message}", True, color)
+        text_rect = screen.blit(text_surf, (SCREEN_WIDTH // 2 - text_surf.get_width() // 2, self.y_pos))
+        dirty_regions.track(self, text_rect, self.message)
+
+class SheetLoader:
+    """One worker thread decoding answer sheets; requesting a new sheet drops the ones still queued."""
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.generation = 0
+        self.thread = None
+
+    def request(self, sheet):
+        self.generation += 1
+        self.jobs.put((self.generation, sheet))
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name="sheet-loader", daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            generation, sheet = self.jobs.get()
+            if generation != self.generation:
+                continue  # The user moved on to another sheet before this one started
+            sheet.load()
+
+sheet_loader = SheetLoader()
+
+class TiledSheet:
+    """A tall answer sheet decoded off the UI thread, scaled to width once and cut into horizontal tiles on demand.
+
+    Only tiles that intersect the viewport are display-converted, and at most
+    SHEET_RESIDENT_TILES of them are kept.
+    """
+    def __init__(self, path, width, tile_height=SHEET_TILE_HEIGHT, max_tiles=SHEET_RESIDENT_TILES):
+        self.path = path
+        self.width = width
+        self.tile_height = tile_height
+        self.max_tiles = max_tiles
+        self.source = None
+        self.scale = 1.0
+        self.height = 0
+        self.error = None
+        self.tiles = OrderedDict()  # tile index -> display surface
+        self.loaded = threading.Event()
+        sheet_loader.request(self)
+
+    def load(self):
+        try:
+            with frame_profiler.span("sheet_load", "io", path=self.path):
+                if DERIVED_IMAGES:
+                    source = derived_images.load(self.path, width=self.width)  # Already trimmed and scaled
+                else:
+                    source = derive_image(self.path, width=self.width)  # The full-size decode is dropped right here
+            self.scale = self.width / source.get_width()
+            self.height = int(source.get_height() * self.scale)
+            self.source = source
+        except Exception as e:
+            print(f"Error loading real answer sheet: {e}")
+            self.error = e
+        self.loaded.set()
+
+    def ready(self):
+        return self.loaded.is_set() and self.source is not None
+
+    def tile(self, index):
+        surface = self.tiles.get(index)
+        if surface is not None:
+            self.tiles.move_to_end(index)
+            return surface
+        top = index * self.tile_height
+        bottom = min(self.height, top + self.tile_height)
+        source_top = int(top / self.scale)
+        source_bottom = max(source_top + 1, min(self.source.get_height(), int(bottom / self.scale)))
+        surface = self.source.subsurface((0, source_top, self.source.get_width(), source_bottom - source_top))
+        if self.scale != 1.0 or surface.get_height() != bottom - top:
+            surface = pygame.transform.scale(surface, (self.width, bottom - top))
+        surface = surface.convert_alpha() if surface.get_alpha() is not None else surface.convert()
+        self.tiles[index] = surface
+        if len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return surface
+
+    def draw(self, screen, dest_rect, scroll_y):
+        """Blit the rows scroll_y.. of the sheet that fit dest_rect."""
+        old_clip = screen.get_clip()
+        screen.set_clip(dest_rect)
+        first = scroll_y // self.tile_height
+        last = min((scroll_y + dest_rect.height - 1) // self.tile_height, (self.height - 1) // self.tile_height)
+        for index in range(first, last + 1):
+            screen.blit(self.tile(index), (dest_rect.x, dest_rect.y + index * self.tile_height - scroll_y))
+        screen.set_clip(old_clip)
 
 class SolutionSheet:
     def __init__(self):
@@ -299,18 +2023,34 @@ class SolutionSheet:
         self.close_hovered = False
         self.scroll_y = 0
         self.image_height = 0
+        self.tiled_sheet = None
+        self.parent = None
+
+    @property
+    def rect(self):
+        if not self.preview_active:
+            return pygame.Rect(0, 0, 0, 0)
+        rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        return rect.union(self.close_rect) if self.opened and self.close_rect else rect
+
+    def sheet_for(self, path):
+        """Start streaming path in the background, reusing the sheet already loaded for it."""
+        if self.tiled_sheet is None or self.tiled_sheet.path != path:
+            self.tiled_sheet = TiledSheet(path, self.full_width)
+        return self.tiled_sheet
 
     def start_preview(self, sheet_path, real_path=None):
         try:
-            self.sheet_image = pygame.image.load(sheet_path).convert_alpha()
+            self.sheet_image = image_cache.get(sheet_path, size=(self.preview_width, self.preview_height))
         except Exception as e:
             print(f"Error loading solution sheet: {e}")
             self.sheet_image = pygame.Surface((self.preview_width, self.preview_height))
             self.sheet_image.fill(GRAY)
-            text = font.render("Preview Not Available", True, BLACK)
+            text = render_text(font, "Preview Not Available", True, BLACK)
             self.sheet_image.blit(text, (10, 10))
-        self.sheet_image = pygame.transform.scale(self.sheet_image, (self.preview_width, self.preview_height))
         self.real_answer_sheet = real_path
+        if real_path:
+            self.sheet_for(real_path)  # Decodes while the user looks at the preview
         self.preview_active = True
         self.opened = False
         self.x = self.preview_x
@@ -329,32 +2069,17 @@ class SolutionSheet:
     def toggle_open(self):
         if self.preview_active:
             if not self.opened and self.real_answer_sheet:
-                try:
-                    original_image = pygame.image.load(self.real_answer_sheet).convert_alpha()
-                    orig_width, orig_height = original_image.get_size()
-                    aspect_ratio = orig_height / orig_width
-                    self.image_height = int(self.full_width * aspect_ratio)
-                    self.sheet_image = pygame.transform.scale(original_image, (self.full_width, self.image_height))
-                    self.width = self.full_width
-                    self.height = self.full_height
-                    self.x = SCREEN_WIDTH - self.full_width - 225
-                    self.y = 50
-                    self.opened = True
-                    self.scroll_y = 0
-                except Exception as e:
-                    print(f"Error loading real answer sheet: {e}")
-                    self.sheet_image = pygame.Surface((self.full_width, self.image_height), pygame.SRCALPHA)
-                    self.sheet_image.fill((0, 0, 0, 0))
-                    self.width = self.full_width
-                    self.height = self.full_height
-                    self.x = SCREEN_WIDTH - self.full_width - 225
-                    self.y = 50
-                    self.opened = True
-                    self.scroll_y = 0
+                sheet = self.sheet_for(self.real_answer_sheet)  # Never blocks, draw shows a placeholder until it is decoded
+                self.image_height = sheet.height
+                self.width = self.full_width
+                self.height = self.full_height
+                self.x = SCREEN_WIDTH - self.full_width - 225
+                self.y = 50
+                self.opened = True
+                self.scroll_y = 0
             else:
                 try:
-                    self.sheet_image = pygame.image.load("Meshes/answer_sheet.png").convert_alpha()
-                    self.sheet_image = pygame.transform.scale(self.sheet_image, (self.preview_width, self.preview_height))
+                    self.sheet_image = image_cache.get("Meshes/answer_sheet.png", size=(self.preview_width, self.preview_height))
                 except Exception as e:
                     print(f"Error resetting to preview: {e}")
                     self.sheet_image = pygame.Surface((self.preview_width, self.preview_height), pygame.SRCALPHA)
@@ -366,9 +2091,7 @@ class SolutionSheet:
                 self.scroll_y = 0
             play_safe(SOUND_PAPER_FOLD)
 
-    def handle_event(self, event, quiz_screen):
-        if event is None:
-            return
+    def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.preview_active:
             mouse_pos = event.pos
             current_rect = pygame.Rect(self.x, self.y, self.width, self.height)
@@ -376,8 +2099,8 @@ class SolutionSheet:
                 self.toggle_open()
             elif not self.opened and current_rect.collidepoint(mouse_pos):
                 self.toggle_open()
-                if quiz_screen.state.current_question and "answer_sheet" in quiz_screen.state.current_question:
-                    self.real_answer_sheet = quiz_screen.state.current_question['answer_sheet']
+                if self.parent and self.parent.state.current_question and self.parent.state.current_question.answer_sheet:
+                    self.real_answer_sheet = self.parent.state.current_question.answer_sheet
         elif event.type == pygame.MOUSEWHEEL and self.opened:
             scroll_amount = -event.y * 30
             self.scroll_y = max(0, min(self.scroll_y + scroll_amount, max(0, self.image_height - self.height)))
@@ -387,123 +2110,762 @@ class SolutionSheet:
             return
         self.update()
         current_rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        sheet_state = None
         if self.opened:
-            src_rect = pygame.Rect(0, self.scroll_y, self.full_width, min(self.height, self.image_height - self.scroll_y))
-            dest_rect = pygame.Rect(self.x, self.y, self.width, min(self.height, self.image_height - self.scroll_y))
-            screen.blit(self.sheet_image, dest_rect, src_rect)
+            sheet = self.tiled_sheet
+            sheet_state = sheet.ready() if sheet else False
+            if sheet_state and sheet.height > self.scroll_y:
+                self.image_height = sheet.height
+                sheet.draw(screen, pygame.Rect(self.x, self.y, self.width, min(self.height, self.image_height - self.scroll_y)), self.scroll_y)
+            else:
+                if sheet is not None and sheet.error:
+                    sheet_state = 'error'
+                    message = "Answer sheet not available"
+                else:
+                    message = "Loading answer sheet..."
+                pygame.draw.rect(screen, GRAY, current_rect)
+                message_text = render_text(font, message, True, BLACK)
+                screen.blit(message_text, message_text.get_rect(center=current_rect.center))
             self.close_rect = pygame.Rect(self.x + self.width - 40, self.y - 40, 30, 30)
             close_color = (200, 0, 0) if self.close_hovered else (255, 0, 0)
             pygame.draw.rect(screen, close_color, self.close_rect)
             pygame.draw.line(screen, WHITE, (self.close_rect.x + 5, self.close_rect.y + 5), (self.close_rect.x + 25, self.close_rect.y + 25), 2)
             pygame.draw.line(screen, WHITE, (self.close_rect.x + 25, self.close_rect.y + 5), (self.close_rect.x + 5, self.close_rect.y + 25), 2)
+            drawn_rect = current_rect.union(self.close_rect)
             if self.image_height > self.height:
-                scroll_text = font.render("Scroll to view the full answer sheet", True, BLACK)
-                screen.blit(scroll_text, (self.x + self.width - 460, self.y - 30))
+                scroll_text = render_text(font, "Scroll to view the full answer sheet", True, BLACK)
+                drawn_rect.union_ip(screen.blit(scroll_text, (self.x + self.width - 460, self.y - 30)))
         else:
             color = BUTTON_HOVER_COLOR if self.hovered else BUTTON_COLOR
             pygame.draw.rect(screen, color, current_rect)
             screen.blit(self.sheet_image, current_rect)
-            answer_sheet_text = large_font.render("Answer Sheet", True, BLACK)
-            screen.blit(answer_sheet_text, (current_rect.x, current_rect.bottom + 10))
+            answer_sheet_text = render_text(large_font, "Answer Sheet", True, BLACK)
+            drawn_rect = current_rect.union(screen.blit(answer_sheet_text, (current_rect.x, current_rect.bottom + 10)))
+        dirty_regions.track(self, drawn_rect, (self.opened, self.scroll_y, self.hovered, self.close_hovered, id(self.sheet_image), sheet_state))
+
+class Button:
+    def __init__(self, x, y, width, height, text, callback, disabled=False, icon=None, parent=None):
+        self.x = x
+        self.y = y
+        self.min_width = width
+        self.min_height = height
+        self.text = text
+        self.callback = callback
+        self.disabled = disabled
+        self.icon = icon
+        self.parent = parent
+        self.hovered = False
+        if self.icon:
+            wrap_width = (self.min_width - 56 - 20) // font.size(" ")[0]
+        else:
+            wrap_width = (self.min_width - 20) // font.size(" ")[0]
+        self.lines = wrap_text(text, wrap_width)
+        text_width = max([font.size(line)[0] for line in self.lines], default=0)
+        if self.icon:
+            self.width = max(self.min_width, 56 + text_width + 20)
+        else:
+            self.width = max(self.min_width, 10 + text_width + 10)
+        self.height = max(self.min_height, len(self.lines) * font.get_height() + 20)
+        self.rect = pygame.Rect(x, y, self.width, self.height)
+
+    def draw(self, screen):
+        if self.disabled:
+            color = GRAY
+        elif self.hovered:
+            color = BUTTON_HOVER_COLOR
+        else:
+            color = BUTTON_COLOR
+        pygame.draw.rect(screen, color, self.rect)
+        if self.icon:
+            screen.blit(self.icon, (self.x + 10, self.y + (self.height - self.icon.get_height()) // 2))
+        text_x = self.x + (56 if self.icon else 10)
+        text_y = self.y + 10
+        for line in self.lines:
+            text_surf = render_text(font, line, True, TEXT_COLOR)
+            screen.blit(text_surf, (text_x, text_y))
+            text_y += font.get_height()
+        dirty_regions.track(self, self.rect, (color, self.lines, self.icon is not None))
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.rect.collidepoint(event.pos) and not self.disabled:
+                self.callback()
+                play_safe(SOUND_BUTTON_CLICK)
+
+    def set_text(self, new_text):
+        self.text = new_text
+        if self.icon:
+            wrap_width = (self.min_width - 56 - 20) // font.size(" ")[0]
+        else:
+            wrap_width = (self.min_width - 20) // font.size(" ")[0]
+        self.lines = wrap_text(new_text, wrap_width)
+        text_width = max([font.size(line)[0] for line in self.lines], default=0)
+        if self.icon:
+            self.width = max(self.min_width, 56 + text_width + 20)
+        else:
+            self.width = max(self.min_width, 10 + text_width + 10)
+        self.height = max(self.min_height, len(self.lines) * font.get_height() + 20)
+        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        event_router.invalidate()
+class Slider:
+    def __init__(self, x, y, width, height, min_value, max_value):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.min_value = min_value
+        self.max_value = max_value if max_value > min_value else min_value + 1
+        self.value = min_value
+        self.dragging = False
+        self.handle_width = 20
+        self.handle_height = height * 2
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(event.pos):
+            self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            relative_x = event.pos[0] - self.rect.x
+            if self.rect.width > 0:
+                self.value = self.min_value + (self.max_value - self.min_value) * (relative_x / self.rect.width)
+                self.value = max(self.min_value, min(self.max_value, round(self.value)))
+
+    def draw(self, screen):
+        if self.max_value == self.min_value:
+            handle_x = self.rect.x
+            handle_rect = pygame.Rect(handle_x, self.rect.y - (self.handle_height - self.rect.height) / 2, self.handle_width, self.handle_height)
+            pygame.draw.rect(screen, BUTTON_COLOR, handle_rect)
+        else:
+            pygame.draw.rect(screen, GRAY, self.rect)
+            if self.rect.width > 0:
+                handle_x = self.rect.x + (self.value - self.min_value) * (self.rect.width - self.handle_width) / (self.max_value - self.min_value)
+                handle_rect = pygame.Rect(handle_x, self.rect.y - (self.handle_height - self.rect.height) / 2, self.handle_width, self.handle_height)
+                pygame.draw.rect(screen, BUTTON_COLOR, handle_rect)
+        track_rect = self.rect.inflate(self.handle_width, self.handle_height - self.rect.height)
+        dirty_regions.track(self, track_rect, (self.value, self.min_value, self.max_value))
+
+class Hotspot:
+    """An invisible rect that passes the events routed to it on to a callback."""
+    def __init__(self, rect, callback):
+        self.rect = pygame.Rect(rect)
+        self.callback = callback
+
+    def handle_event(self, event):
+        self.callback(event)
+
+class SpatialIndex:
+    """Uniform grid over widget rects, a point lookup only tests the widgets sharing its cell."""
+    def __init__(self, widgets, cell_size=HIT_GRID_CELL):
+        self.widgets = widgets
+        self.cell_size = cell_size
+        self.cells = {}
+        self.members = set()
+        for z, widget in enumerate(widgets):
+            self.members.add(id(widget))
+            rect = widget.rect
+            for cx in range(rect.left // cell_size, (rect.right - 1) // cell_size + 1):
+                for cy in range(rect.top // cell_size, (rect.bottom - 1) // cell_size + 1):
+                    self.cells.setdefault((cx, cy), []).append((z, widget))
+
+    def candidates(self, pos):
+        return self.cells.get((pos[0] // self.cell_size, pos[1] // self.cell_size), ())
+
+    def __contains__(self, widget):
+        return id(widget) in self.members
+
+class EventRouter:
+    """Pumps the event queue once per frame and routes input through z-ordered widget layers.
+
+    Layers are lists of objects with a rect and handle_event(event), bottom to top. Clicks and
+    wheel events go to the topmost widget under the pointer, a modal layer hides everything
+    below it, and motion and button releases go to the widget that took the last click. Keys go
+    there too when it has wants_keys set.
+    """
+    def __init__(self):
+        self.events = []
+        self.mouse_pos = (0, 0)
+        self.focus = None
+        self.hovered = None
+        self.indexes = OrderedDict()  # id(widget list) -> (widget list, SpatialIndex)
+        self.routed = 0
+        self.hit_tests = 0
+        self.candidates_tested = 0
+        self.index_builds = 0
+
+    def pump(self):
+        self.events = pygame.event.get()
+        self.mouse_pos = pygame.mouse.get_pos()
+        return self.events, self.mouse_pos
+
+    def invalidate(self):
+        """Drop every index, for widgets whose rects changed in place."""
+        self.indexes.clear()
+
+    def index_for(self, widgets):
+        if len(widgets) <= HIT_SCAN_LIMIT:
+            return widgets
+        cached = self.indexes.get(id(widgets))
+        if cached and cached[0] is widgets and len(cached[1].widgets) == len(widgets):
+            self.indexes.move_to_end(id(widgets))
+            return cached[1]
+        index = SpatialIndex(widgets)
+        self.index_builds += 1
+        self.indexes[id(widgets)] = (widgets, index)  # Holding the list keeps its id from being reused
+        while len(self.indexes) > HIT_INDEXES:
+            self.indexes.popitem(last=False)
+        return index
+
+    def hit(self, layers, pos):
+        """Topmost widget in layers whose rect contains pos, or None."""
+        self.hit_tests += 1
+        for layer in reversed(layers):
+            candidates = layer.candidates(pos) if isinstance(layer, SpatialIndex) else enumerate(layer)
+            best = None
+            for z, widget in candidates:
+                self.candidates_tested += 1
+                if (best is None or z > best[0]) and widget.rect.collidepoint(pos):
+                    best = (z, widget)
+            if best:
+                return best[1]
+        return None
+
+    def set_focus(self, widget):
+        if widget is not self.focus and hasattr(self.focus, 'blur'):
+            self.focus.blur()
+        self.focus = widget
+
+    def set_hovered(self, widget):
+        if widget is self.hovered:
+            return
+        if hasattr(self.hovered, 'hovered'):
+            self.hovered.hovered = False
+        if hasattr(widget, 'hovered'):
+            widget.hovered = True
+        self.hovered = widget
+
+    def route(self, layers, events, mouse_pos, modal=None, keyboard=None):
+        """Deliver this frame's events to the widgets in layers, with modal on top of them all.
+
+        keyboard gets the key presses while no widget in layers that wants keys holds the focus.
+        """
+        self.mouse_pos = mouse_pos
+        layers = [self.index_for(widgets) for widgets in layers if widgets]
+        if modal:
+            layers = [self.index_for(modal)]
+        focused = self.focus is not None and any(self.focus in layer for layer in layers)
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                target = self.hit(layers, event.pos)
+                self.set_focus(target)
+                focused = target is not None
+            elif event.type == pygame.MOUSEWHEEL:
+                target = self.hit(layers, mouse_pos)
+            elif event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP):
+                target = self.focus if focused else None
+            elif event.type in (pygame.KEYDOWN, pygame.TEXTINPUT):
+                target = self.focus if focused and getattr(self.focus, 'wants_keys', False) else None
+                if target is None and event.type == pygame.KEYDOWN and not modal:
+                    target = keyboard
+            else:
+                target = None
+            if target is not None:
+                self.routed += 1
+                target.handle_event(event)
+        self.set_hovered(self.hit(layers, mouse_pos))
+
+    def stats(self):
+        return {
+            'routed': self.routed,
+            'hit_tests': self.hit_tests,
+            'avg_candidates': round(self.candidates_tested / self.hit_tests, 2) if self.hit_tests else 0.0,
+            'index_builds': self.index_builds,
+        }
+
+event_router = EventRouter()
+
+class Filmstrip:
+    """Row of thumbnails centered on the current item; clicking one calls on_select with its index."""
+    wants_keys = True
+
+    def __init__(self, rect, on_select, spacing=6):
+        self.rect = pygame.Rect(rect)
+        self.on_select = on_select
+        self.cell = THUMB_SIZE[0] + spacing
+        self.visible = max(1, (self.rect.width + spacing) // self.cell)
+        self.paths = []
+        self.current = 0
+        self.hovered = False
+
+    def first_index(self):
+        return max(0, min(self.current - self.visible // 2, len(self.paths) - self.visible))
+
+    def window(self, extra=0):
+        """Indices on screen plus extra on each side, nearest to the current item first."""
+        first = self.first_index()
+        indices = range(max(0, first - extra), min(len(self.paths), first + self.visible + extra))
+        return sorted(indices, key=lambda i: abs(i - self.current))
+
+    def handle_event(self, event):
+        if not self.paths:
+            return
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            index = self.first_index() + (event.pos[0] - self.rect.x) // self.cell
+            if index < len(self.paths):
+                self.on_select(index)
+        elif event.type == pygame.MOUSEWHEEL:
+            self.on_select(max(0, min(len(self.paths) - 1, self.current - event.y)))
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+            step = -1 if event.key == pygame.K_LEFT else 1
+            self.on_select(max(0, min(len(self.paths) - 1, self.current + step)))
+
+    def draw(self, screen):
+        first = self.first_index()
+        loaded = 0
+        for offset, path in enumerate(self.paths[first:first + self.visible]):
+            dest = pygame.Rect(self.rect.x + offset * self.cell, self.rect.y, THUMB_SIZE[0], THUMB_SIZE[1])
+            area = thumbnails.area(path)
+            if area is not None:
+                screen.blit(thumbnails.surface, dest, area)
+                loaded += 1
+            else:
+                pygame.draw.rect(screen, GRAY, dest)
+            if first + offset == self.current:
+                pygame.draw.rect(screen, BUTTON_COLOR, dest.inflate(4, 4), 2)
+        dirty_regions.track(self, self.rect.inflate(4, 4), (first, self.current, len(self.paths), loaded))
+
+class ScrollList:
+    """Scrolling list or grid of buttons that only builds, lays out and draws the rows in its viewport.
+
+    make_button(index) builds the button for one item when it scrolls into view; its position is
+    set here. Items run across the columns row by row, or down each column with column_major.
+    """
+    wants_keys = True
+
+    def __init__(self, rect, count, make_button, row_height=50, columns=1, column_width=None,
+                 spacing=20, column_major=False, scroll_y=0):
+        self.rect = pygame.Rect(rect)
+        self.count = count
+        self.make_button = make_button
+        self.row_height = row_height
+        self.columns = columns
+        self.column_width = column_width or self.rect.width
+        self.spacing = spacing
+        self.column_major = column_major
+        self.pitch = row_height + spacing
+        self.rows = (count + columns - 1) // columns
+        self.content_height = max(0, self.rows * self.pitch - spacing)
+        grid_width = columns * self.column_width + (columns - 1) * spacing
+        self.left = self.rect.centerx - grid_width // 2
+        self.buttons = {}  # item index -> Button, only for the rows in view
+        self.hovered = False
+        self.velocity = 0.0
+        self.last_update = None
+        self.built = 0
+        self.scroll_to(scroll_y)
+
+    @property
+    def max_scroll(self):
+        return max(0, self.content_height - self.rect.height)
+
+    def scroll_to(self, y):
+        self.scroll_y = max(0, min(self.max_scroll, y))
+
+    def item_index(self, row, col):
+        index = col * self.rows + row if self.column_major else row * self.columns + col
+        return index if index < self.count and 0 <= col < self.columns else None
+
+    def visible_rows(self):
+        first = int(self.scroll_y) // self.pitch
+        return first, min(self.rows, (int(self.scroll_y) + self.rect.height) // self.pitch + 1)
+
+    def layout(self):
+        first, last = self.visible_rows()
+        visible = {}
+        top = self.rect.y - int(self.scroll_y)
+        for row in range(first, last):
+            for col in range(self.columns):
+                index = self.item_index(row, col)
+                if index is None:
+                    continue
+                btn = self.buttons.get(index)
+                if btn is None:
+                    btn = self.make_button(index)
+                    self.built += 1
+                btn.x = self.left + col * (self.column_width + self.spacing) + (self.column_width - btn.width) // 2
+                btn.y = top + row * self.pitch
+                btn.rect.topleft = (btn.x, btn.y)
+                visible[index] = btn
+        self.buttons = visible  # Rows that scrolled out are dropped
+        return visible
+
+    def item_at(self, pos):
+        """Index of the laid out button under pos, found from the row and column arithmetic."""
+        if not self.rect.collidepoint(pos):
+            return None
+        row = (pos[1] - self.rect.y + int(self.scroll_y)) // self.pitch
+        col = (pos[0] - self.left) // (self.column_width + self.spacing)
+        index = self.item_index(row, col) if pos[0] >= self.left else None
+        btn = self.buttons.get(index)
+        return index if btn and btn.rect.collidepoint(pos) else None
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.velocity = 0.0
+            btn = self.buttons.get(self.item_at(event.pos))
+            if btn:
+                btn.handle_event(event)
+        elif event.type == pygame.MOUSEWHEEL:
+            self.velocity -= event.y * SCROLL_IMPULSE
+        elif event.type == pygame.KEYDOWN:
+            page = max(self.pitch, self.rect.height - self.pitch)
+            steps = {pygame.K_PAGEDOWN: page, pygame.K_PAGEUP: -page, pygame.K_DOWN: self.pitch, pygame.K_UP: -self.pitch}
+            if event.key in steps:
+                self.scroll_to(self.scroll_y + steps[event.key])
+            elif event.key == pygame.K_HOME:
+                self.scroll_to(0)
+            elif event.key == pygame.K_END:
+                self.scroll_to(self.max_scroll)
+            else:
+                return
+            self.velocity = 0.0
+
+    def update(self):
+        now = time.perf_counter()
+        dt = min(now - self.last_update, 0.1) if self.last_update else 0.0
+        self.last_update = now
+        if self.velocity:
+            self.scroll_to(self.scroll_y + self.velocity * dt)
+            self.velocity *= math.exp(-SCROLL_FRICTION * dt)
+            if abs(self.velocity) < 20 or self.scroll_y in (0, self.max_scroll):
+                self.velocity = 0.0
+
+    def draw(self, screen):
+        self.update()
+        visible = self.layout()
+        hovered = self.item_at(event_router.mouse_pos) if self.hovered else None
+        clip = screen.get_clip()
+        screen.set_clip(self.rect)
+        for index, btn in visible.items():
+            btn.hovered = index == hovered
+            btn.draw(screen)
+        screen.set_clip(clip)
+        if self.max_scroll:
+            bar_height = max(30, self.rect.height * self.rect.height // self.content_height)
+            bar_y = self.rect.y + (self.rect.height - bar_height) * self.scroll_y / self.max_scroll
+            pygame.draw.rect(screen, GRAY, (self.rect.right - 8, bar_y, 6, bar_height))
+        dirty_regions.track(self, self.rect, (int(self.scroll_y), tuple(visible)))
+
+QUESTION_MULTI_CHOICE = 'multi_choice'
+QUESTION_FILL_IN = 'fill_in'
+QUESTION_FREE = 'free'
+
+def normalize_tag(tag):
+    return tag.lower().replace('-', '_')
+
+# Normalized tag -> question type, multiple choice wins when a question has both
+TAG_TYPES = {normalize_tag(v): QUESTION_FILL_IN for v in FILL_IN_VARIATIONS}
+TAG_TYPES.update({normalize_tag(v): QUESTION_MULTI_CHOICE for v in MULTI_CHOICE_VARIATIONS})
+
+ALTERNATIVES_PATTERN = re.compile(r"\s*\|\s*|\s+or\s+")  # "3/4 | 0.75", "2 or -2"
+RANGE_PATTERN = re.compile(r"(?:[a-z]\s*(?:in|=)\s*)?\[\s*([^,\]]+?)\s*,\s*([^\]]+?)\s*\]")  # "x in [35,42]"
+TOLERANCE_PATTERN = re.compile(r"(.+?)\s*(?:±|\+/-|\+-)\s*(.+)")  # "3.14 +- 0.005"
+MIXED_NUMBER_PATTERN = re.compile(r"(-?)(\d+)\s+(\d+)\s*/\s*(\d+)")  # "2 1/2"
+DECIMAL_PATTERN = re.compile(r"[-+]?(?:\d{1,3}(?:,\d{3})+|\d*)(?:\.\d+)?")  # "1,200.5", ".5"; no exponents
+FRACTION_PATTERN = re.compile(r"([-+]?\d+)\s*/\s*(\d+)")  # "-3/4", "3 / 4"
+
+def parse_number(text):
+    """Exact value of "12", "1,200", "-3/4", "2 1/2", "0.625" or "50%", None if text is not a number.
+
+    Only these shapes are parsed: Fraction() would also take "1e5000000" and spend minutes building it.
+    """
+    text = text.strip()
+    if text.endswith('%'):
+        text = text[:-1].strip()
+    try:
+        mixed = MIXED_NUMBER_PATTERN.fullmatch(text)
+        if mixed:
+            sign, whole, numerator, denominator = mixed.groups()
+            value = int(whole) + Fraction(int(numerator), int(denominator))
+            return -value if sign else value
+        fraction = FRACTION_PATTERN.fullmatch(text)
+        if fraction:
+            return Fraction(int(fraction.group(1)), int(fraction.group(2)))
+        if DECIMAL_PATTERN.fullmatch(text) and any(c.isdigit() for c in text):
+            return Fraction(text.replace(',', ''))
+    except (ValueError, ZeroDivisionError):
+        pass  # Digit strings past int's conversion limit land here too
+    return None
+
+class AnswerKey:
+    """An answer compiled once: accepted texts, exact values with tolerances, and ranges."""
+    __slots__ = ('question_type', 'texts', 'values', 'ranges', 'errors')
+
+    def __init__(self, question_type, texts, values, ranges, errors):
+        self.question_type = question_type
+        self.texts = texts  # frozenset of lowercased accepted answers
+        self.values = values  # tuple of (Fraction, tolerance)
+        self.ranges = ranges  # tuple of (low, high), inclusive
+        self.errors = errors  # alternatives that could not be parsed as numbers
+
+@functools.lru_cache(maxsize=None)
+def compile_answer(answer, tags):
+    """Compile answer text for a question with tags (a tuple); identical answers share one key."""
+    tag_types = {TAG_TYPES.get(normalize_tag(tag)) for tag in tags}
+    if QUESTION_MULTI_CHOICE in tag_types:
+        question_type = QUESTION_MULTI_CHOICE
+    elif QUESTION_FILL_IN in tag_types:
+        question_type = QUESTION_FILL_IN
+    else:
+        question_type = QUESTION_FREE
+    normalized = answer.lower().strip()
+    alternatives = [alt for alt in ALTERNATIVES_PATTERN.split(normalized) if alt]
+    values, ranges, errors = [], [], []
+    if question_type == QUESTION_FILL_IN:
+        for alt in alternatives:
+            bounds = RANGE_PATTERN.fullmatch(alt)
+            tolerance = TOLERANCE_PATTERN.fullmatch(alt)
+            if bounds:
+                low, high = parse_number(bounds.group(1)), parse_number(bounds.group(2))
+                if low is not None and high is not None:
+                    ranges.append((min(low, high), max(low, high)))
+                    continue
+            elif tolerance:
+                value, slack = parse_number(tolerance.group(1)), parse_number(tolerance.group(2))
+                if value is not None and slack is not None:
+                    values.append((value, abs(slack)))
+                    continue
+            else:
+                value = parse_number(alt)
+                if value is not None:
+                    values.append((value, ANSWER_TOLERANCE))
+                    continue
+            errors.append(alt)
+    return AnswerKey(question_type, frozenset(alternatives) | {normalized}, tuple(values), tuple(ranges), tuple(errors))
+
+def answer_key(question):
+    return compile_answer(question.answer or '', question.tags or ())
+
+def check(question, text):
+    """Grade text against question without side effects.
+
+    Returns 'correct', 'incorrect', 'empty', 'not_a_choice' (a multiple choice question
+    got something other than a-d) or 'not_a_value' (a fill-in question got a letter).
+    """
+    key = answer_key(question)
+    user = text.lower().strip()
+    if not user:
+        return 'empty'
+    is_choice = len(user) == 1 and user in 'abcd'
+    if key.question_type == QUESTION_MULTI_CHOICE and not is_choice:
+        return 'not_a_choice'
+    if key.question_type == QUESTION_FILL_IN and is_choice:
+        return 'not_a_value'
+    if user in key.texts:
+        return 'correct'
+    if key.values or key.ranges:
+        number = parse_number(user)
+        if number is not None:
+            if any(abs(number - value) < tolerance for value, tolerance in key.values):
+                return 'correct'
+            if any(low <= number <= high for low, high in key.ranges):
+                return 'correct'
+    return 'incorrect'
+
+def validate_bank(parts=None):
+    """Compile every answer in the given parts (all by default) and report the ones that cannot be graded."""
+    problems = []
+    for part in parts if parts is not None else storage.list_parts():
+        for section_key, section in storage.load_part(part).get("sections", {}).items():
+            for question in section.get("questions", []):
+                answer = question.answer or ''
+                key = answer_key(question)
+                if not answer.strip():
+                    problem = "empty answer"
+                elif key.question_type == QUESTION_MULTI_CHOICE and not key.texts & set('abcd'):
+                    problem = "multiple choice answer is not a-d"
+                elif key.errors:
+                    problem = f"not a number: {', '.join(key.errors)}"
+                else:
+                    continue
+                problems.append((part, section_key, question.id, answer, problem))
+    for part, section_key, question_id, answer, problem in problems:
+        print(f"{part}/{section_key}/{question_id}: {answer!r} ({problem})")
+    print(f"{len(problems)} answers need attention")
+    return problems
+
+# A card is [due (epoch seconds), ease, interval (days), repetitions or Leitner box]
+NEW_CARD = (0, 2.5, 0, 0)
+
+def sm2_review(card, correct, now):
+    due, ease, interval, reps = card
+    quality = 4 if correct else 2
+    ease = max(1.3, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if not correct:
+        return [now + RELEARN_DELAY, ease, 0, 0]
+    reps += 1
+    interval = 1 if reps == 1 else 6 if reps == 2 else interval * ease
+    return [now + interval * 86400, ease, interval, reps]
+
+def leitner_review(card, correct, now):
+    due, ease, interval, box = card
+    if not correct:
+        return [now + RELEARN_DELAY, ease, 0, 0]
+    box = min(box + 1, len(LEITNER_INTERVALS) - 1)
+    interval = LEITNER_INTERVALS[box]
+    return [now + interval * 86400, ease, interval, box]
+
+SCHEDULERS = {'sm2': sm2_review, 'leitner': leitner_review}
+
+class ReviewSchedule:
+    """Every question's card across sessions, keyed "part/section/id" and saved to the profile's SCHEDULE_FILE."""
+    def __init__(self, data_dir=DATA_DIR, profile=None):
+        self.path = profile_path(SCHEDULE_FILE, data_dir, profile)
+        self.cards = None
+
+    def load(self):
+        if self.cards is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.cards = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.cards = {}
+        return self.cards
+
+    @staticmethod
+    def key(part, section, question_id):
+        return f"{part}/{section}/{question_id}"
 
-class Button:
-    def __init__(self, x, y, width, height, text, callback, disabled=False, icon=None, parent=None):
-        self.x = x
-        self.y = y
-        self.min_width = width
-        self.min_height = height
-        self.text = text
-        self.callback = callback
-        self.disabled = disabled
-        self.icon = icon
-        self.parent = parent
-        self.hovered = False
-        if self.icon:
-            wrap_width = (self.min_width - 56 - 20) // font.size(" ")[0]
-        else:
-            wrap_width = (self.min_width - 20) // font.size(" ")[0]
-        self.lines = textwrap.wrap(text, width=wrap_width)
-        text_width = max([font.size(line)[0] for line in self.lines], default=0)
-        if self.icon:
-            self.width = max(self.min_width, 56 + text_width + 20)
-        else:
-            self.width = max(self.min_width, 10 + text_width + 10)
-        self.height = max(self.min_height, len(self.lines) * font.get_height() + 20)
-        self.rect = pygame.Rect(x, y, self.width, self.height)
+    def card(self, key):
+        return self.load().get(key, NEW_CARD)
 
-    def update_hover(self, mouse_pos):
-        self.hovered = self.rect.collidepoint(mouse_pos)
+    def review(self, key, correct, now=None):
+        cards = self.load()
+        cards[key] = SCHEDULERS[SCHEDULER](cards.get(key, NEW_CARD), correct, now or time.time())
+        persistence.replace(self.path, self.snapshot)  # Serialized by the writer, not on the frame
 
-    def draw(self, screen):
-        if self.disabled:
-            color = GRAY
-        elif self.hovered:
-            color = BUTTON_HOVER_COLOR
-        else:
-            color = BUTTON_COLOR
-        pygame.draw.rect(screen, color, self.rect)
-        if self.icon:
-            screen.blit(self.icon, (self.x + 10, self.y + (self.height - self.icon.get_height()) // 2))
-        text_x = self.x + (56 if self.icon else 10)
-        text_y = self.y + 10
-        for line in self.lines:
-            text_surf = font.render(line, True, TEXT_COLOR)
-            screen.blit(text_surf, (text_x, text_y))
-            text_y += font.get_height()
+    def snapshot(self):
+        # dict.copy() of str keys never releases the GIL, so the writer gets a consistent copy
+        return json.dumps(self.cards.copy(), separators=(',', ':'))
 
-    def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.rect.collidepoint(event.pos) and not self.disabled:
-                self.callback()
-                play_safe(SOUND_BUTTON_CLICK)
+class SessionScheduler:
+    """Orders a session lazily: the position the quiz reaches next is filled from a heap.
 
-    def set_text(self, new_text):
-        self.text = new_text
-        if self.icon:
-            wrap_width = (self.min_width - 56 - 20) // font.size(" ")[0]
-        else:
-            wrap_width = (self.min_width - 20) // font.size(" ")[0]
-        self.lines = textwrap.wrap(new_text, width=wrap_width)
-        text_width = max([font.size(line)[0] for line in self.lines], default=0)
-        if self.icon:
-            self.width = max(self.min_width, 56 + text_width + 20)
-        else:
-            self.width = max(self.min_width, 10 + text_width + 10)
-        self.height = max(self.min_height, len(self.lines) * font.get_height() + 20)
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
-class Slider:
-    def __init__(self, x, y, width, height, min_value, max_value):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.min_value = min_value
-        self.max_value = max_value if max_value > min_value else min_value + 1
-        self.value = min_value
-        self.dragging = False
-        self.handle_width = 20
-        self.handle_height = height * 2
+    Heap entries are (due, ease, order): overdue cards first, then new ones in file (or
+    shuffled) order, then the rest by due time, weaker cards first on ties. Positions up
+    to `placed` are fixed so Back keeps working; the unplaced tail is in no particular order.
+    """
+    def __init__(self, schedule, entries, now=None, placed=0, reviewed=()):
+        now = now or time.time()
+        self.schedule = schedule
+        self.keys = {}  # id(question) -> card key
+        self.heap = []
+        for order, (question, key) in enumerate(entries):
+            due, ease = schedule.card(key)[:2]
+            self.heap.append((due or now, ease, order, question))
+            self.keys[id(question)] = key
+        heapq.heapify(self.heap)
+        self.placed = placed  # Resumed sessions keep the order they had already fixed
+        self.positions = {}  # id(question) -> slot in remaining as of the last rebuild, for the unplaced tail
+        self.gone = []  # Sorted slots removed since the rebuild, everything after one sits a place lower
+        self.dirty = True
+        self.reviewed = set(reviewed)
 
-    def update(self, mouse_pos, events):
-        for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(mouse_pos):
-                self.dragging = True
-            elif event.type == pygame.MOUSEBUTTONUP:
-                self.dragging = False
-            elif event.type == pygame.MOUSEMOTION and self.dragging:
-                relative_x = mouse_pos[0] - self.rect.x
-                if self.rect.width > 0:
-                    self.value = self.min_value + (self.max_value - self.min_value) * (relative_x / self.rect.width)
-                    self.value = max(self.min_value, min(self.max_value, round(self.value)))
+    def place(self, remaining, upto):
+        """Fill positions up to upto with the most urgent unplaced questions."""
+        upto = min(upto, len(remaining) - 1)
+        while self.placed <= upto and self.heap:
+            if self.dirty:
+                self.positions = {id(q): i for i, q in enumerate(remaining[self.placed:], self.placed)}
+                self.gone = []
+                self.dirty = False
+            question = heapq.heappop(self.heap)[3]
+            slot = self.positions.pop(id(question), None)
+            if slot is None:
+                continue
+            shift = bisect.bisect_left(self.gone, slot)
+            if shift < len(self.gone) and self.gone[shift] == slot:
+                continue  # Aced meanwhile
+            index = slot - shift
+            if index != self.placed:
+                other = remaining[self.placed]
+                remaining[self.placed], remaining[index] = question, other
+                self.positions[id(other)] = slot
+            self.placed += 1
 
-    def draw(self, screen):
-        if self.max_value == self.min_value:
-            handle_x = self.rect.x
-            handle_rect = pygame.Rect(handle_x, self.rect.y - (self.handle_height - self.rect.height) / 2, self.handle_width, self.handle_height)
-            pygame.draw.rect(screen, BUTTON_COLOR, handle_rect)
-        else:
-            pygame.draw.rect(screen, GRAY, self.rect)
-            if self.rect.width > 0:
-                handle_x = self.rect.x + (self.value - self.min_value) * (self.rect.width - self.handle_width) / (self.max_value - self.min_value)
-                handle_rect = pygame.Rect(handle_x, self.rect.y - (self.handle_height - self.rect.height) / 2, self.handle_width, self.handle_height)
-                pygame.draw.rect(screen, BUTTON_COLOR, handle_rect)
+    def slot(self, index):
+        """The rebuild-time slot of whatever is at index in remaining now."""
+        low, high = index, index + len(self.gone)
+        while low < high:  # Smallest slot with index live slots before it
+            middle = (low + high) // 2
+            if middle - bisect.bisect_right(self.gone, middle) < index:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def removed(self, index=None):
+        """Note that remaining lost the entry at index; None if the position is unknown."""
+        if index is None or index < self.placed:
+            self.placed = max(0, self.placed - 1)
+        if index is None:
+            self.dirty = True
+        elif not self.dirty:
+            bisect.insort(self.gone, self.slot(index))  # Later entries are shifted when they are placed
+
+    def review(self, question, correct):
+        """Record the first graded answer to question in this session."""
+        key = self.keys.get(id(question))
+        if key and key not in self.reviewed:
+            self.reviewed.add(key)
+            self.schedule.review(key, correct)
+
+class SessionCheckpoint:
+    """The running session as question ids and counters, rewritten through the persistence worker."""
+    FIELDS = {'part': str, 'sections': list, 'order': list, 'index': int, 'solved': list, 'aced': list,
+              'elapsed': (int, float), 'total': int, 'placed': int, 'reviewed': list}
+
+    def __init__(self, data_dir=DATA_DIR, profile=None):
+        self.path = profile_path(SESSION_FILE, data_dir, profile)
+        self.signature = None
+        self.saved_at = 0
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            checkpoint = json.loads(content) if content else None
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if checkpoint is not None and not self.is_valid(checkpoint):
+            print(f"Warning: {self.path} is not a session checkpoint, ignoring it")
+            return None
+        return checkpoint
+
+    @classmethod
+    def is_valid(cls, checkpoint):
+        """Whether checkpoint has every field save() writes, with the types resume_session relies on."""
+        if not isinstance(checkpoint, dict):
+            return False
+        if any(not isinstance(checkpoint.get(field), kind) for field, kind in cls.FIELDS.items()):
+            return False
+        sections = checkpoint['sections']
+        if not all(isinstance(section, str) for section in sections):
+            return False
+        for entry in checkpoint['order']:
+            if not (isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], int)
+                    and 0 <= entry[0] < len(sections) and isinstance(entry[1], str)):
+                return False
+        return all(isinstance(item, (str, int)) for field in ('solved', 'aced', 'reviewed') for item in checkpoint[field])
+
+    def save(self, checkpoint, signature):
+        self.signature = signature
+        self.saved_at = time.monotonic()
+        persistence.replace(self.path, json.dumps(checkpoint, separators=(',', ':')))
+
+    def is_due(self, signature):
+        return signature != self.signature or time.monotonic() - self.saved_at >= CHECKPOINT_INTERVAL
+
+    def clear(self):
+        self.signature = None
+        persistence.replace(self.path, "")
 
 class GameState:
     def __init__(self):
@@ -518,9 +2880,20 @@ class GameState:
         self.last_submit_time = 0
         self.quiz_start_time = 0
         self.current_question_index = 0
-        self.aced_questions = {part: {} for part in SUBJECT_PARTS}
+        self.parts = list(SUBJECT_PARTS)
+        self.aced_questions = {part: {} for part in self.parts}
+        self.question_ids = {}  # part -> section -> {question id: question}
+        self.aced_ids = {}  # part -> section -> set of aced question ids
+        self.aced_id_counts = {}  # part -> Counter of aced ids over all sections
+        self.loader = None
         self.main_menu_confirmation = False
         self.reset_timer_confirmation = False
+        self.widget_trees = {}  # screen -> (inputs key, buttons), see get_widgets
+        self.schedule = ReviewSchedule()
+        self.scheduler = None  # SessionScheduler of the running session
+        self.session_keys = {}  # id(question) -> (section, question id) for the running session
+        self.checkpoints = SessionCheckpoint()
+        self.checkpoint = None  # Saved session offered on the main menu
 
     def can_submit(self):
         return pygame.time.get_ticks() - self.last_submit_time >= SUBMIT_COOLDOWN
@@ -529,26 +2902,41 @@ class GameState:
         self.current_part = subject_part
         self.current_sections = sections
         self.current_session = {'remaining': [], 'total_questions': 0, 'aced_in_session': set(), 'solved': set()}
+        self.scheduler = None
+        self.checkpoint = None
+        self.session_keys = {}
         all_questions = []
+        keys = []
         for section in sections:
             questions = self.load_questions(subject_part, section)
-            aced_ids = {aq['id'] for aq in self.aced_questions[subject_part].get(section, [])}
-            section_questions = [q for q in questions if q['id'] not in aced_ids]
+            aced_ids = self.section_aced_ids(subject_part, section)
+            section_questions = [q for q in questions if q.id not in aced_ids]
             all_questions.extend(section_questions)
+            keys.extend(ReviewSchedule.key(subject_part, section, q.id) for q in section_questions)
+            self.session_keys.update((id(q), (section, q.id)) for q in section_questions)
         if not all_questions:
             self.current_screen = "main_menu"
             return
         self.current_session['remaining'] = all_questions
         if self.randomize:
             random.seed()  # Reseed to ensure a fresh shuffle each time
-            random.shuffle(self.current_session['remaining'])
+            entries = list(zip(all_questions, keys))
+            random.shuffle(entries)
+            self.current_session['remaining'] = all_questions = [q for q, _ in entries]
+            keys = [key for _, key in entries]
             print("Questions shuffled for this session")
-        else:
+        if SCHEDULER in SCHEDULERS:
+            # The shuffled or file order only breaks ties between cards that are equally due
+            self.scheduler = SessionScheduler(self.schedule, zip(all_questions, keys))
+            self.schedule_ahead(0)
+            print(f"Questions ordered by the {SCHEDULER} scheduler, due cards first")
+        elif not self.randomize:
             print("Questions presented in original order from JSON")
         self.current_session['total_questions'] = len(self.current_session['remaining']) + sum(len(self.aced_questions[subject_part].get(section, [])) for section in sections)
         self.current_screen = "quiz"
         self.current_question_index = 0
         self.current_question = self.current_session['remaining'][0] if self.current_session['remaining'] else None
+        prefetch_questions(self.current_session['remaining'], 0)
         self.quiz_start_time = pygame.time.get_ticks()
         self.last_submit_time = 0
         initial_aced = self.current_session['total_questions'] - len(self.current_session['remaining'])
@@ -556,14 +2944,101 @@ class GameState:
         self.quiz.progress_bar.current_progress = 0
         self.quiz.progress_bar.start_animation(progress)
 
+    def resume_session(self):
+        """Rebuild the checkpointed session, loading only the part it needs."""
+        checkpoint = self.checkpoint
+        self.checkpoint = None
+        part, sections = checkpoint['part'], checkpoint['sections']
+        self.ensure_part(part)
+        lookup = self.question_ids.get(part, {})
+        remaining, keys = [], []
+        self.session_keys = {}
+        for section_index, question_id in checkpoint['order']:
+            section = sections[section_index]
+            question = lookup.get(section, {}).get(question_id)
+            if question is None or question_id in self.section_aced_ids(part, section):
+                continue  # Removed from the bank or aced since
+            remaining.append(question)
+            keys.append(ReviewSchedule.key(part, section, question_id))
+            self.session_keys[id(question)] = (section, question_id)
+        if not remaining:
+            self.checkpoints.clear()
+            return
+        self.current_part = part
+        self.current_sections = sections
+        self.current_session = {'remaining': remaining, 'total_questions': checkpoint['total'],
+                                'aced_in_session': set(checkpoint['aced']), 'solved': set(checkpoint['solved'])}
+        self.scheduler = None
+        if SCHEDULER in SCHEDULERS:
+            self.scheduler = SessionScheduler(self.schedule, zip(remaining, keys),
+                                              placed=min(checkpoint['placed'], len(remaining)), reviewed=checkpoint['reviewed'])
+        index = min(checkpoint['index'], len(remaining) - 1)
+        self.current_question_index = self.quiz.current_question_index = index
+        self.schedule_ahead(index)
+        self.current_question = remaining[index]
+        self.quiz_start_time = pygame.time.get_ticks() - checkpoint['elapsed']
+        self.last_submit_time = 0
+        self.current_screen = "quiz"
+        prefetch_questions(remaining, index)
+        total = self.current_session['total_questions']
+        self.quiz.progress_bar.current_progress = 0
+        self.quiz.progress_bar.start_animation((total - len(remaining)) / total if total else 0)
+        self.quiz.update_button_states()
+        print(f"Resumed session in {part} at question {index + 1}/{len(remaining)}")
+
+    def save_checkpoint(self):
+        """Checkpoint the running quiz when it changed, or every CHECKPOINT_INTERVAL seconds."""
+        if self.current_screen != "quiz" or not self.current_session.get('remaining'):
+            return
+        session = self.current_session
+        index = self.quiz.current_question_index
+        scheduler = self.scheduler
+        signature = (self.current_part, index, len(session['remaining']), len(session['solved']),
+                     len(session['aced_in_session']), self.quiz_start_time,
+                     scheduler.placed if scheduler else 0, len(scheduler.reviewed) if scheduler else 0)
+        if not self.checkpoints.is_due(signature):
+            return
+        section_numbers = {section: number for number, section in enumerate(self.current_sections)}
+        order = []
+        for question in session['remaining']:
+            section, question_id = self.session_keys[id(question)]
+            order.append((section_numbers[section], question_id))
+        self.checkpoints.save({
+            'part': self.current_part,
+            'sections': list(self.current_sections),
+            'order': order,
+            'index': index,
+            'solved': sorted(session['solved']),
+            'aced': sorted(session['aced_in_session']),
+            'elapsed': self.get_quiz_time(),
+            'total': session['total_questions'],
+            'placed': scheduler.placed if scheduler else len(order),
+            'reviewed': sorted(scheduler.reviewed) if scheduler else [],
+        }, signature)
+
+    def end_session(self):
+        self.current_session.clear()
+        self.scheduler = None
+        self.session_keys = {}
+        self.checkpoints.clear()
+
+    def schedule_ahead(self, index):
+        """Fix the order of the session up to a few questions past index."""
+        if self.scheduler:
+            self.scheduler.place(self.current_session['remaining'], index + PREFETCH_AHEAD)
+
+    def record_review(self, question, correct):
+        if self.scheduler:
+            self.scheduler.review(question, correct)
+
     def ace_question(self):
-        print(f"Acing question {self.current_question['id']}")
+        print(f"Acing question {self.current_question.id}")
         if not self.current_question or not self.current_session['remaining']:
             print("No current question or remaining questions to ace")
             return
-        question_id = self.current_question['id']
-        already_aced_globally = any(q['id'] == question_id for section in self.current_sections
-                                    for q in self.aced_questions[self.current_part].get(section, []))
+        question_id = self.current_question.id
+        part = self.current_part
+        already_aced_globally = any(question_id in self.section_aced_ids(part, section) for section in self.current_sections)
         if already_aced_globally:
             print(f"Question {question_id} already aced globally, skipping")
             self.quiz.ace_button = None
@@ -573,11 +3048,10 @@ class GameState:
             self.quiz.ace_button = None
             return
         for section in self.current_sections:
-            questions = self.load_questions(self.current_part, section)
-            if any(q['id'] == question_id for q in questions):
+            if question_id in self.question_ids.get(part, {}).get(section, {}):
                 print(f"Saving question {question_id} as aced in section {section}")
-                self.save_aced_question(self.current_part, section, self.current_question.copy())
-                self.current_session['remaining'] = [q for q in self.current_session['remaining'] if q['id'] != question_id]
+                self.save_aced_question(part, section, self.current_question)
+                self.remove_from_session(self.current_question)
                 self.current_session['aced_in_session'].add(question_id)
                 initial_total = self.current_session['total_questions']
                 current_remaining = len(self.current_session['remaining'])
@@ -589,72 +3063,125 @@ class GameState:
                     self.current_screen = "main_menu"
                 else:
                     self.current_question_index = min(self.current_question_index, len(self.current_session['remaining']) - 1)
+                    self.schedule_ahead(self.current_question_index)
                     self.current_question = self.current_session['remaining'][self.current_question_index] if self.current_session['remaining'] else None
                     if self.current_question:
                         self.quiz.solution_sheet.preview_active = False
+                        prefetch_questions(self.current_session['remaining'], self.current_question_index)
                 self.quiz.ace_button = None
                 print(f"Question {question_id} aced successfully. Remaining questions: {len(self.current_session['remaining'])}")
                 break
 
+    def remove_from_session(self, question):
+        remaining = self.current_session['remaining']
+        # The shown question is almost always at one of the tracked indexes, avoid scanning for it
+        for index in (self.quiz.current_question_index, self.current_question_index):
+            if 0 <= index < len(remaining) and remaining[index] is question:
+                del remaining[index]
+                if self.scheduler:
+                    self.scheduler.removed(index)
+                return
+        self.current_session['remaining'] = [q for q in remaining if q.id != question.id]
+        if self.scheduler:
+            self.scheduler.removed()  # Position unknown, unfix one and rebuild to be safe
+
     def show_completion_message(self):
         screen.fill(WHITE)
-        text = large_font.render("All questions aced in this section, congrats!", True, BLACK)
+        text = render_text(large_font, "All questions aced in this section, congrats!", True, BLACK)
         screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2))
         pygame.display.flip()
         pygame.time.wait(3000)
+        image_prefetcher.cancel()
         self.current_screen = "main_menu"
         self.current_question = None
-        self.current_session.clear()
+        self.end_session()
+
+    def ensure_part(self, part):
+        """Materialize a part the first time it is selected."""
+        if part in self.all_data:
+            return
+        if self.loader:
+            data = wait_for_part(self, part)
+        else:
+            data = storage.load_part(part)
+        self.all_data[part] = data
+        self.load_aced_questions(part)
+
+    def select_part(self, part, next_screen):
+        self.ensure_part(part)
+        self.current_part = part
+        self.current_screen = next_screen
+
+    def load_aced_questions(self, part):
+        sections = self.all_data[part].get("sections", {})
+        self.aced_questions.setdefault(part, {})
+        for section in sections:
+            self.aced_questions[part][section] = sections[section].get('aced_questions', [])
+        self.index_part(part)
+
+    def index_part(self, part):
+        """Build the id lookups for a part; save_aced_question and unace_question keep them in sync."""
+        sections = self.all_data[part].get("sections", {})
+        self.question_ids[part] = {section: {q.id: q for q in section_data.get('questions', [])}
+                                   for section, section_data in sections.items()}
+        self.aced_ids[part] = {section: {q.id for q in section_data.get('aced_questions', [])}
+                               for section, section_data in sections.items()}
+        self.aced_id_counts[part] = Counter(question_id for ids in self.aced_ids[part].values() for question_id in ids)
+        for section_data in sections.values():
+            for question in section_data.get('questions', []):
+                answer_key(question)  # Compile answers now rather than on the first submit
 
-    def load_aced_questions(self):
-        for part in SUBJECT_PARTS:
-            data = load_json(os.path.join(DATA_DIR, f"{part}.json"))
-            sections = data.get("sections", {})
-            for section in sections:
-                self.aced_questions[part][section] = sections[section].get('aced_questions', [])
+    def section_aced_ids(self, part, section):
+        return self.aced_ids.setdefault(part, {}).setdefault(section, set())
+
+    def is_aced(self, part, question_id):
+        """True if question_id is aced in any section of part."""
+        return self.aced_id_counts.get(part, {}).get(question_id, 0) > 0
 
     def save_aced_question(self, part, section, question):
-        if 'id' not in question:
+        if question.id is None:
             print("Error: Question lacks 'id' field")
             return
-        data = load_json(os.path.join(DATA_DIR, f"{part}.json"))
-        sections = data.get("sections", {})
-        if section not in sections:
-            sections[section] = {"section_name": section, "questions": [], "aced_questions": []}
-        if 'aced_questions' not in sections[section]:
-            sections[section]['aced_questions'] = []
-        if not any(q['id'] == question['id'] for q in sections[section]['aced_questions']):
-            sections[section]['aced_questions'].append(question)
-            self.aced_questions[part][section] = sections[section]['aced_questions']
-            print(f"Saved question {question['id']} to aced_questions in {part}/{section}. Total aced: {len(sections[section]['aced_questions'])}")
-        self.save_questions(part, data)
+        self.ensure_part(part)
+        sections = self.all_data[part].setdefault("sections", {})
+        aced_ids = self.section_aced_ids(part, section)
+        if question.id in aced_ids:
+            return
+        # Keep a reference to the bank's entry, the progress record itself only names the id
+        question = self.question_ids.get(part, {}).get(section, {}).get(question.id, question)
+        section_data = sections.setdefault(section, {"section_name": section, "questions": []})
+        section_data.setdefault('aced_questions', []).append(question)
+        aced_ids.add(question.id)
+        self.aced_id_counts.setdefault(part, Counter())[question.id] += 1
+        self.aced_questions[part][section] = section_data['aced_questions']
+        self.record_progress(part, {'op': 'ace', 'section': section, 'id': question.id, 'time': time.time()})
+        print(f"Saved question {question.id} to aced_questions in {part}/{section}. Total aced: {len(sections[section]['aced_questions'])}")
 
     def unace_question(self, part, section, question_id):
-        data = load_json(os.path.join(DATA_DIR, f"{part}.json"))
-        sections = data.get("sections", {})
-        if section in sections and 'aced_questions' in sections[section]:
-            sections[section]['aced_questions'] = [q for q in sections[section]['aced_questions']
-                                                  if q['id'] != question_id]
-            self.aced_questions[part][section] = sections[section]['aced_questions']
-            self.save_questions(part, data)
+        self.ensure_part(part)
+        sections = self.all_data[part].get("sections", {})
+        aced_ids = self.section_aced_ids(part, section)
+        if section in sections and question_id in aced_ids:
+            section_data = sections[section]
+            section_data['aced_questions'] = [q for q in section_data.get('aced_questions', []) if q.id != question_id]
+            aced_ids.discard(question_id)
+            self.aced_id_counts[part][question_id] -= 1
+            self.aced_questions[part][section] = section_data['aced_questions']
+            self.record_progress(part, {'op': 'unace', 'section': section, 'id': question_id, 'time': time.time()})
+
+    def record_progress(self, part, record):
+        """Append to the profile's journal for part and fold it into the progress file every so often."""
+        try:
+            storage.record_progress(part, record, self.all_data[part])
+        except Exception as e:
+            print(f"Error saving progress for {part}: {e}")
 
     def load_questions(self, subject_part, section):
         data = self.all_data.get(subject_part, {"sections": {}})
         sections = data.get("sections", {})
         if section not in sections:
             sections[section] = {"section_name": section, "questions": [], "aced_questions": []}
-        section_data = sections[section]
-        questions = section_data.get("questions", [])
-        for q in questions:
-            q["section_name"] = section_data.get("section_name", section)
-        return questions
-
-    def save_questions(self, subject_part, data):
-        self.all_data[subject_part] = data
-        filename = f"{subject_part}.json"
-        filepath = os.path.join(DATA_DIR, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        return sections[section].get("questions", [])
 
     def get_quiz_time(self):
         return pygame.time.get_ticks() - self.quiz_start_time
@@ -682,12 +3209,28 @@ class QuizScreen:
             Button(SCREEN_WIDTH - 222, 120, 200, 50, "Reset Timer", self.show_reset_confirmation, parent=self)
         ]
         self.ace_button = None
+        popup_x = (SCREEN_WIDTH - 400) // 2
+        popup_y = (SCREEN_HEIGHT - 200) // 2
+        self.main_menu_popup_buttons = [
+            Button(popup_x + 400 // 4 - 40, popup_y + 120, 80, 40, "Yes", lambda: self.confirm_main_menu(True)),
+            Button(popup_x + 3 * 400 // 4 - 40, popup_y + 120, 80, 40, "No", lambda: self.confirm_main_menu(False))
+        ]
+        self.reset_popup_buttons = [
+            Button(popup_x + 400 // 4 - 40, popup_y + 120, 80, 40, "Yes", lambda: self.confirm_reset_timer(True)),
+            Button(popup_x + 3 * 400 // 4 - 40, popup_y + 120, 80, 40, "No", lambda: self.confirm_reset_timer(False))
+        ]
         self.animation = AnswerAnimation()
         self.solution_sheet = SolutionSheet()
+        self.solution_sheet.parent = self
         self.show_clock = True
         self.question_scroll_y = 0
         self.question_image_height = 0
         self.question_image = None
+        self.question_view = Hotspot(self.image_rect, self.scroll_question)
+
+    def scroll_question(self, event):
+        if event.type == pygame.MOUSEWHEEL and self.question_image_height > 500:
+            self.question_scroll_y = max(0, min(self.question_scroll_y - event.y * 30, self.question_image_height - 500))
 
     def previous_question(self):
         if self.current_question_index > 0 and self.state.current_session['remaining']:
@@ -698,6 +3241,7 @@ class QuizScreen:
             self.ace_button = None
             self.answer_box.text = ""
             self.update_button_states()
+            prefetch_questions(self.state.current_session['remaining'], self.current_question_index)
 
     def show_main_menu_confirmation(self):
         self.state.main_menu_confirmation = True
@@ -706,7 +3250,8 @@ class QuizScreen:
         if confirm:
             self.state.current_screen = "main_menu"
             self.state.current_question = None
-            self.state.current_session.clear()
+            self.state.end_session()
+            image_prefetcher.cancel()
             self.current_question_index = 0
             self.ace_button = None
             self.answer_box.text = ""
@@ -715,24 +3260,29 @@ class QuizScreen:
     def next_question(self):
         if self.current_question_index < len(self.state.current_session['remaining']) - 1 and self.state.current_session['remaining']:
             self.current_question_index += 1
+            self.state.schedule_ahead(self.current_question_index)
             self.state.current_question = self.state.current_session['remaining'][self.current_question_index]
             self.state.show_answer = False
             self.solution_sheet.preview_active = False
             self.ace_button = None
             self.answer_box.text = ""
             self.update_button_states()
+            prefetch_questions(self.state.current_session['remaining'], self.current_question_index)
 
     def skip_question(self):
         if self.state.current_session['remaining']:
             remaining = self.state.current_session['remaining']
             self.current_question_index = (self.current_question_index + 1) % len(remaining)
+            self.state.schedule_ahead(self.current_question_index)
             self.state.current_question = remaining[self.current_question_index]
             self.state.show_answer = False
             self.solution_sheet.preview_active = False
             self.ace_button = None
             self.answer_box.text = ""
             self.update_button_states()
+            prefetch_questions(self.state.current_session['remaining'], self.current_question_index)
 
+    @profiled("check_answer", 'app')
     def check_answer(self):
         try:
             if not self.state.current_question:
@@ -743,12 +3293,9 @@ class QuizScreen:
                 self.animation.message = "Please wait before submitting again"
                 play_safe(SOUND_INCORRECT)
                 return
-            user_answer = self.answer_box.text.lower().strip()
-            correct_answer = self.state.current_question['answer'].lower().strip()
-            tags = [tag.lower().replace('-', '_') for tag in self.state.current_question.get("tags", [])]
-            is_multi_choice = any(variation.replace('-', '_') in tags for variation in MULTI_CHOICE_VARIATIONS)
-            is_fill_in = any(variation.replace('-', '_') in tags for variation in FILL_IN_VARIATIONS)
-            if not user_answer:
+            question = self.state.current_question
+            verdict = check(question, self.answer_box.text)
+            if verdict == 'empty':
                 self.animation.start(False)
                 self.animation.message = "Come on, at least try :("
                 play_safe(SOUND_INCORRECT)
@@ -756,101 +3303,39 @@ class QuizScreen:
                 self.ace_button = None
                 self.update_button_states()
                 return
+            if answer_key(question).question_type == QUESTION_FREE:
+                print("No recognized tags, using default comparison")
 
-            def is_numerical_match(user, correct):
-                try:
-                    user_num = float(user.replace(',', ''))
-                    correct_num = float(correct.replace(',', ''))
-                    return abs(user_num - correct_num) < 0.01
-                except ValueError:
-                    return False
-
-            correct = user_answer == correct_answer or (is_fill_in and is_numerical_match(user_answer, correct_answer))
-
-            if is_multi_choice:
-                if len(user_answer) == 1 and user_answer in 'abcd':
-                    if correct:
-                        motivational = random.choice(MOTIVATIONAL_SPEECHES)
-                        self.animation.start(True)
-                        self.animation.message = f"Correct :) {motivational}"
-                        play_safe(SOUND_CORRECT)
-                        question_id = self.state.current_question.get('id')
-                        already_aced = question_id in self.state.current_session['aced_in_session']
-                        if not already_aced:
-                            self.ace_button = Button(620, 630, 150, 40, "Ace Question", self.state.ace_question, parent=self)
-                        else:
-                            self.ace_button = None
-                        self.answer_box.text = ""
-                        self.state.current_session['solved'].add(self.current_question_index)
-                    else:
-                        self.animation.start(False)
-                        self.animation.message = "Incorrect :("
-                        play_safe(SOUND_INCORRECT)
-                        self.answer_box.text = ""
-                        self.ace_button = None
-                        real_answer_sheet = self.state.current_question.get("answer_sheet", None)
-                        if real_answer_sheet:
-                            self.solution_sheet.start_preview("Meshes/answer_sheet.png", real_answer_sheet)
-                else:
-                    self.animation.start(False)
-                    self.animation.message = "Please enter 'a', 'b', 'c', or 'd'"
-                    play_safe(SOUND_INCORRECT)
-                    self.answer_box.text = ""
-                    self.ace_button = None
-
-            elif is_fill_in:
-                if len(user_answer) == 1 and user_answer in 'abcd':
-                    self.animation.start(False)
-                    self.animation.message = "Enter a number or text, not a letter choice"
-                    play_safe(SOUND_INCORRECT)
-                    self.answer_box.text = ""
-                    self.ace_button = None
-                elif correct:
-                    motivational = random.choice(MOTIVATIONAL_SPEECHES)
-                    self.animation.start(True)
-                    self.animation.message = f"Correct :) {motivational}"
-                    play_safe(SOUND_CORRECT)
-                    question_id = self.state.current_question.get('id')
-                    already_aced = question_id in self.state.current_session['aced_in_session']
-                    if not already_aced:
-                        self.ace_button = Button(620, 630, 150, 40, "Ace Question", self.state.ace_question, parent=self)
-                    else:
-                        self.ace_button = None
-                    self.answer_box.text = ""
-                    self.state.current_session['solved'].add(self.current_question_index)
+            if verdict in ('correct', 'incorrect'):
+                self.state.record_review(question, verdict == 'correct')
+            if verdict == 'correct':
+                motivational = random.choice(MOTIVATIONAL_SPEECHES)
+                self.animation.start(True)
+                self.animation.message = f"Correct :) {motivational}"
+                play_safe(SOUND_CORRECT)
+                already_aced = question.id in self.state.current_session['aced_in_session']
+                if not already_aced:
+                    self.ace_button = Button(620, 630, 150, 40, "Ace Question", self.state.ace_question, parent=self)
                 else:
-                    self.animation.start(False)
-                    self.animation.message = "Incorrect :("
-                    play_safe(SOUND_INCORRECT)
-                    self.answer_box.text = ""
                     self.ace_button = None
-                    real_answer_sheet = self.state.current_question.get("answer_sheet", None)
-                    if real_answer_sheet:
-                        self.solution_sheet.start_preview("Meshes/answer_sheet.png", real_answer_sheet)
-
+                self.state.current_session['solved'].add(self.current_question_index)
+            elif verdict == 'incorrect':
+                self.animation.start(False)
+                self.animation.message = "Incorrect :("
+                play_safe(SOUND_INCORRECT)
+                self.ace_button = None
+                real_answer_sheet = question.answer_sheet
+                if real_answer_sheet:
+                    self.solution_sheet.start_preview("Meshes/answer_sheet.png", real_answer_sheet)
             else:
-                print("No recognized tags, using default comparison")
-                if correct:
-                    motivational = random.choice(MOTIVATIONAL_SPEECHES)
-                    self.animation.start(True)
-                    self.animation.message = f"Correct :) {motivational}"
-                    play_safe(SOUND_CORRECT)
-                    question_id = self.state.current_question.get('id')
-                    already_aced = question_id in self.state.current_session['aced_in_session']
-                    if not already_aced:
-                        self.ace_button = Button(620, 630, 150, 40, "Ace Question", self.state.ace_question, parent=self)
-                    else:
-                        self.ace_button = None
-                    self.state.current_session['solved'].add(self.current_question_index)
+                self.animation.start(False)
+                if verdict == 'not_a_choice':
+                    self.animation.message = "Please enter 'a', 'b', 'c', or 'd'"
                 else:
-                    self.animation.start(False)
-                    self.animation.message = "Incorrect :("
-                    play_safe(SOUND_INCORRECT)
-                    self.ace_button = None
-                    real_answer_sheet = self.state.current_question.get("answer_sheet", None)
-                    if real_answer_sheet:
-                        self.solution_sheet.start_preview("Meshes/answer_sheet.png", real_answer_sheet)
-                self.answer_box.text = ""
+                    self.animation.message = "Enter a number or text, not a letter choice"
+                play_safe(SOUND_INCORRECT)
+                self.ace_button = None
+            self.answer_box.text = ""
 
             self.state.last_submit_time = current_time
             self.update_button_states()
@@ -874,10 +3359,8 @@ class QuizScreen:
             elif btn.text == "Submit":
                 btn.disabled = not self.state.current_question or (current_time - self.state.last_submit_time < SUBMIT_COOLDOWN)
         if self.ace_button:
-            question_id = self.state.current_question.get('id')
-            already_aced = any(q['id'] == question_id for section in self.state.aced_questions[self.state.current_part]
-                               for q in self.state.aced_questions[self.state.current_part][section])
-            if already_aced:
+            question_id = self.state.current_question.id
+            if self.state.is_aced(self.state.current_part, question_id):
                 self.ace_button = None
 
     def toggle_clock(self):
@@ -893,6 +3376,7 @@ class QuizScreen:
             self.state.reset_timer()
         self.state.reset_timer_confirmation = False
 
+    @profiled("QuizScreen.draw")
     def draw(self, screen):
         if self.state.current_screen != "quiz":
             return
@@ -900,24 +3384,15 @@ class QuizScreen:
         if not self.state.current_session['remaining']:
             self.state.current_screen = "main_menu"
             return
-        section_text = self.state.current_question.get("section_name", "Unknown Section")
+        section_text = self.state.current_question.section_name or "Unknown Section"
         draw_wrapped_text(screen, f"Section: {section_text}", 30, 50, font, BLACK, 500)
-        if "tags" in self.state.current_question:
-            tags_text = ", ".join(self.state.current_question["tags"])
+        if self.state.current_question.tags is not None:
+            tags_text = ", ".join(self.state.current_question.tags)
             draw_wrapped_text(screen, f"Tags: {tags_text}", 30, 77, font, BLACK, 500)
         try:
-            img_path = self.state.current_question['image']
-            img = pygame.image.load(img_path).convert_alpha()
-            orig_width, orig_height = img.get_size()
-            if orig_width <= 500:
-                scaled_width = orig_width
-                scaled_height = orig_height
-                self.question_image = img
-            else:
-                scale_factor = 500 / orig_width
-                scaled_width = 500
-                scaled_height = int(orig_height * scale_factor)
-                self.question_image = pygame.transform.scale(img, (scaled_width, scaled_height))
+            img_path = self.state.current_question.image
+            self.question_image = image_cache.get(img_path, width=500, upscale=False)
+            scaled_width, scaled_height = self.question_image.get_size()
             self.question_image_height = scaled_height
             if scaled_height > 500:
                 src_y = self.question_scroll_y
@@ -925,7 +3400,7 @@ class QuizScreen:
                 src_rect = pygame.Rect(0, src_y, scaled_width, src_height)
                 x = 30 + (500 - scaled_width) // 2
                 screen.blit(self.question_image, (x, 100), src_rect)
-                scroll_text = font.render("Scroll to view the full image", True, GRAY)
+                scroll_text = render_text(font, "Scroll to view the full image", True, GRAY)
                 screen.blit(scroll_text, (550, 150))
             else:
                 x = 30 + (500 - scaled_width) // 2
@@ -936,7 +3411,7 @@ class QuizScreen:
             print(f"Error loading image: {e}")
             img = pygame.Surface((500, 500))
             img.fill(GRAY)
-            img.blit(font.render("Missing Image", True, BLACK), (10, 10))
+            img.blit(render_text(font, "Missing Image", True, BLACK), (10, 10))
             screen.blit(img, (30, 100))
             self.question_scroll_y = 0
         pygame.draw.rect(screen, BLACK, self.image_rect, 2)
@@ -948,17 +3423,16 @@ class QuizScreen:
         self.progress_bar.draw(screen)
         total_questions = len(self.state.current_session['remaining'])
         current_display = self.current_question_index + 1
-        progress_text = font.render(f"{current_display}/{total_questions}", True, BLACK)
-        screen.blit(progress_text, (20, 20))
+        progress_message = f"{current_display}/{total_questions}"
+        progress_text = render_text(font, progress_message, True, BLACK)
+        dirty_regions.track("quiz_progress_text", screen.blit(progress_text, (20, 20)), progress_message)
         self.answer_box.draw(screen)
         for btn in self.buttons:
-            btn.update_hover(pygame.mouse.get_pos())
             btn.draw(screen)
         if self.ace_button:
-            self.ace_button.update_hover(pygame.mouse.get_pos())
             self.ace_button.draw(screen)
         if self.state.show_answer:
-            answer_text = large_font.render(self.state.current_question['answer'], True, BLACK)
+            answer_text = render_text(large_font, self.state.current_question.answer or '', True, BLACK)
             screen.blit(answer_text, (SCREEN_WIDTH // 2 - answer_text.get_width() // 2 - 100,
                                       SCREEN_HEIGHT // 2 - answer_text.get_height() // 2))
         self.animation.update()
@@ -969,25 +3443,10 @@ class QuizScreen:
             quiz_time = self.state.get_quiz_time()
             minutes = quiz_time // 60000
             seconds = (quiz_time % 60000) // 1000
-            time_text = font.render(f"Time: {minutes:02d}:{seconds:02d}", True, BLACK)
-            screen.blit(time_text, (SCREEN_WIDTH - 200, 20))
-        if self.state.reset_timer_confirmation:
-            popup_width, popup_height = 400, 200
-            popup_x, popup_y = (SCREEN_WIDTH - popup_width) // 2, (SCREEN_HEIGHT - popup_height) // 2
-            pygame.draw.rect(screen, GRAY, (popup_x, popup_y, popup_width, popup_height))
-            text = font.render("Are you sure you want to reset the timer?", True, BLACK)
-            screen.blit(text, (popup_x + (popup_width - text.get_width()) // 2, popup_y + 20))
-            yes_btn = Button(popup_x + 100, popup_y + 120, 80, 40, "Yes", lambda: self.confirm_reset_timer(True))
-            no_btn = Button(popup_x + 220, popup_y + 120, 80, 40, "No", lambda: self.confirm_reset_timer(False))
-            yes_btn.update_hover(pygame.mouse.get_pos())
-            no_btn.update_hover(pygame.mouse.get_pos())
-            yes_btn.draw(screen)
-            no_btn.draw(screen)
-            for event in pygame.event.get():
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    yes_btn.handle_event(event)
-                    no_btn.handle_event(event)
-        copyright_surf = font.render(COPYRIGHT_TEXT, True, BLACK)
+            time_message = f"Time: {minutes:02d}:{seconds:02d}"
+            time_text = render_text(font, time_message, True, BLACK)
+            dirty_regions.track("quiz_clock", screen.blit(time_text, (SCREEN_WIDTH - 200, 20)), time_message)
+        copyright_surf = render_text(font, COPYRIGHT_TEXT, True, BLACK)
         screen.blit(copyright_surf, (20, SCREEN_HEIGHT - 40))
 
 class AcedViewScreen:
@@ -1004,6 +3463,11 @@ class AcedViewScreen:
             SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2, 200, 50, "Back",
             lambda: setattr(self.state, 'current_screen', 'aced_section_select')
         )
+        popup_x, popup_y = (SCREEN_WIDTH - 400) // 2, (SCREEN_HEIGHT - 200) // 2
+        self.unace_popup_buttons = [
+            Button(popup_x + 100, popup_y + 120, 80, 40, "Yes", lambda: self.confirm_unace(True)),
+            Button(popup_x + 220, popup_y + 120, 80, 40, "No", lambda: self.confirm_unace(False))
+        ]
         self.unace_confirmation = False
         self.selected_question_id = None
         self.slider = None
@@ -1013,14 +3477,21 @@ class AcedViewScreen:
         self.close_button = None
         self.current_section = None
         self.solution_sheet = SolutionSheet()
+        self.image_hotspot = Hotspot(self.image_rect, self.click_image)
+        self.filmstrip = Filmstrip((30, 606, 500, THUMB_SIZE[1]), self.select_aced)
+        self.filmstrip_source = None
+        self.shown_path = None
+        self.moved_at = 0
+        self.settled_path = None
+        self.image_state = None
 
+    @profiled("AcedViewScreen.draw")
     def draw(self, screen):
         screen.fill(WHITE)
         aced_list = self.state.aced_questions[self.state.current_part][self.state.current_section]
         if not aced_list:
-            self.no_aced_back_btn.update_hover(pygame.mouse.get_pos())
             self.no_aced_back_btn.draw(screen)
-            text = font.render("No aced questions in this section", True, BLACK)
+            text = render_text(font, "No aced questions in this section", True, BLACK)
             screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 - 50))
             return
         if not self.slider or self.slider.max_value != max(0, len(aced_list) - 1):
@@ -1028,48 +3499,92 @@ class AcedViewScreen:
             self.slider.value = self.current_aced_index
         if self.current_aced_index < len(aced_list):
             question = aced_list[self.current_aced_index]
+            self.update_images(aced_list)
             try:
-                img = pygame.image.load(question['image'])
-                img = pygame.transform.scale(img, (500, 500))
+                img = self.question_image(question.image)
             except Exception:
                 img = pygame.Surface((500, 500))
                 img.fill(GRAY)
-                img.blit(font.render("Missing Image", True, BLACK), (10, 10))
+                img.blit(render_text(font, "Missing Image", True, BLACK), (10, 10))
             screen.blit(img, (30, 100))
             pygame.draw.rect(screen, BLACK, self.image_rect, 2)
-            id_text = large_font.render(f"ID: {question['id']}", True, BLACK)
+            id_text = render_text(large_font, f"ID: {question.id}", True, BLACK)
             screen.blit(id_text, (30, 30))
-            section_text = font.render(question.get("section_name", ""), True, BLACK)
+            section_text = render_text(font, question.section_name or "", True, BLACK)
             screen.blit(section_text, (30 + (500 - section_text.get_width()) // 2, 50))
             for btn in self.buttons:
-                btn.update_hover(pygame.mouse.get_pos())
                 btn.draw(screen)
             if self.unace_confirmation:
                 popup_width, popup_height = 400, 200
                 popup_x, popup_y = (SCREEN_WIDTH - popup_width) // 2, (SCREEN_HEIGHT - popup_height) // 2
                 pygame.draw.rect(screen, GRAY, (popup_x, popup_y, popup_width, popup_height))
-                text = font.render("Confirm unacing this question?", True, BLACK)
+                text = render_text(font, "Confirm unacing this question?", True, BLACK)
                 screen.blit(text, (popup_x + (popup_width - text.get_width()) // 2, popup_y + 20))
-                yes_btn = Button(popup_x + 100, popup_y + 120, 80, 40, "Yes", lambda: self.confirm_unace(True))
-                no_btn = Button(popup_x + 220, popup_y + 120, 80, 40, "No", lambda: self.confirm_unace(False))
-                yes_btn.update_hover(pygame.mouse.get_pos())
-                no_btn.update_hover(pygame.mouse.get_pos())
+                yes_btn, no_btn = self.unace_popup_buttons
                 yes_btn.draw(screen)
                 no_btn.draw(screen)
             if self.slider:
                 self.slider.draw(screen)
+            self.filmstrip.draw(screen)
             self.solution_sheet.draw(screen)
             if self.show_image_popup and self.popup_image and self.popup_answer:
                 popup_width, popup_height = 700, 500
                 popup_x, popup_y = (SCREEN_WIDTH - popup_width) // 2, (SCREEN_HEIGHT - popup_height) // 2
                 pygame.draw.rect(screen, GRAY, (popup_x, popup_y, popup_width, popup_height))
                 screen.blit(self.popup_image, (popup_x + (popup_width - self.popup_image.get_width()) // 2, popup_y + 20))
-                answer_text = large_font.render(self.popup_answer, True, BLACK)
+                answer_text = render_text(large_font, self.popup_answer, True, BLACK)
                 screen.blit(answer_text, (popup_x + (popup_width - answer_text.get_width()) // 2,
                                          popup_y + 420))
-                self.close_button.update_hover(pygame.mouse.get_pos())
                 self.close_button.draw(screen)
 
+    def update_images(self, aced_list):
+        """Follow the current index: thumbnails as they decode, neighbors prefetched once it stops being dragged."""
+        thumbnails.pump()
+        if self.filmstrip_source != (id(aced_list), len(aced_list)):
+            self.filmstrip_source = (id(aced_list), len(aced_list))
+            self.filmstrip.paths = [q.image for q in aced_list]
+            self.settled_path = None
+        self.filmstrip.current = self.current_aced_index
+        path = aced_list[self.current_aced_index].image
+        now = pygame.time.get_ticks()
+        if path != self.shown_path:
+            self.shown_path = path
+            self.moved_at = now
+        dragging = self.slider is not None and self.slider.dragging
+        if self.settled_path != path and not dragging:
+            self.settled_path = path
+            index = self.current_aced_index
+            nearby = range(max(0, index - ACED_PREFETCH), min(len(aced_list), index + ACED_PREFETCH + 1))
+            image_prefetcher.schedule([(aced_list[i].image, (500, 500), None, True)
+                                       for i in sorted(nearby, key=lambda i: abs(i - index))])
+            paths = self.filmstrip.paths
+            thumbnails.request([paths[i] for i in self.filmstrip.window(THUMB_ATLAS_SLOTS // 2)[:THUMB_ATLAS_SLOTS]])
+
+    def question_image(self, path):
+        """The full image, or its upscaled thumbnail while the slider is dragged or the index still moving."""
+        dragging = self.slider is not None and self.slider.dragging
+        scrubbing = dragging or pygame.time.get_ticks() - self.moved_at < SCRUB_SETTLE_MS
+        if scrubbing and not image_cache.has(path, size=(500, 500)):
+            placeholder = thumbnails.placeholder(path, (500, 500))
+            if placeholder is not None:
+                self.image_state = 'thumbnail'
+                return placeholder
+            if dragging:  # Decoding now would stall the drag, the thumbnail is on its way
+                self.image_state = 'blank'
+                blank = pygame.Surface((500, 500))
+                blank.fill(GRAY)
+                return blank
+        self.image_state = 'full'
+        return image_cache.get(path, size=(500, 500))
+
+    def select_aced(self, index):
+        aced_list = self.state.aced_questions[self.state.current_part][self.state.current_section]
+        if aced_list:
+            self.current_aced_index = max(0, min(index, len(aced_list) - 1))
+            if self.slider:
+                self.slider.value = self.current_aced_index
+            self.update_button_states()
+
     def previous_aced(self):
         aced_list = self.state.aced_questions[self.state.current_part][self.state.current_section]
         if aced_list and self.current_aced_index > 0:
@@ -1087,7 +3602,7 @@ class AcedViewScreen:
     def show_unace_confirmation(self):
         aced_list = self.state.aced_questions[self.state.current_part][self.state.current_section]
         if aced_list:
-            self.selected_question_id = aced_list[self.current_aced_index]['id']
+            self.selected_question_id = aced_list[self.current_aced_index].id
             self.unace_confirmation = True
 
     def confirm_unace(self, confirm):
@@ -1112,14 +3627,17 @@ class AcedViewScreen:
             elif btn.text in ["Main Menu", "Back"]:
                 btn.disabled = False
 
+    def click_image(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            self.handle_image_click(event.pos)
+
     def handle_image_click(self, pos):
         aced_list = self.state.aced_questions[self.state.current_part][self.state.current_section]
         if aced_list and self.image_rect.collidepoint(pos):
             question = aced_list[self.current_aced_index]
             try:
-                self.popup_image = pygame.image.load(question['image']).convert_alpha()
-                self.popup_image = pygame.transform.scale(self.popup_image, (600, 400))
-                self.popup_answer = question['answer']
+                self.popup_image = image_cache.get(question.image, size=(600, 400))
+                self.popup_answer = question.answer or ''
                 self.show_image_popup = True
                 popup_width, popup_height = 700, 500
                 self.popup_x = (SCREEN_WIDTH - popup_width) // 2
@@ -1130,8 +3648,8 @@ class AcedViewScreen:
                 print(f"Error loading popup image: {e}")
                 self.popup_image = pygame.Surface((600, 400))
                 self.popup_image.fill(GRAY)
-                self.popup_image.blit(font.render("Missing Image", True, BLACK), (10, 10))
-                self.popup_answer = question['answer']
+                self.popup_image.blit(render_text(font, "Missing Image", True, BLACK), (10, 10))
+                self.popup_answer = question.answer or ''
                 self.show_image_popup = True
                 popup_width, popup_height = 700, 500
                 self.popup_x = (SCREEN_WIDTH - popup_width) // 2
@@ -1146,10 +3664,19 @@ class AcedViewScreen:
         self.close_button = None
         play_safe(SOUND_BUTTON_CLICK)
 
-    def handle_slider(self, mouse_pos, events):
+    def handle_events(self, events, mouse_pos):
         aced_list = self.state.aced_questions[self.state.current_part][self.state.current_section]
-        if aced_list and self.slider:
-            self.slider.update(mouse_pos, events)
+        if not aced_list:
+            event_router.route([[self.no_aced_back_btn]], events, mouse_pos)
+            return
+        modal = None
+        if self.show_image_popup and self.close_button:
+            modal = [self.close_button]
+        elif self.unace_confirmation:
+            modal = self.unace_popup_buttons
+        widgets = [self.image_hotspot, self.filmstrip] + ([self.slider] if self.slider else [])
+        event_router.route([widgets, self.buttons], events, mouse_pos, modal, keyboard=self.filmstrip)
+        if self.slider:
             self.current_aced_index = int(self.slider.value)
             self.current_aced_index = max(0, min(self.current_aced_index, len(aced_list) - 1))
             self.update_button_states()
@@ -1167,6 +3694,10 @@ class SettingsScreen:
             Button(100, 100, 200, 50, "Back", lambda: setattr(self.state, 'current_screen', 'main_menu')),
             self.randomize_button
         ]
+        self.slider_hotspots = [
+            Hotspot((slider['x'], slider['y'], slider['width'], slider['height']), lambda event, k=key: self.click_volume(k, event))
+            for key, slider in self.volume_sliders.items()
+        ]
         self.load_settings()
 
     def load_settings(self):
@@ -1179,10 +3710,7 @@ class SettingsScreen:
                     elif key in VOLUMES:
                         VOLUMES[key] = settings[key]
                         self.volume_sliders[key]['value'] = settings[key]
-            SOUND_BUTTON_CLICK.set_volume(VOLUMES['click'])
-            SOUND_CORRECT.set_volume(VOLUMES['correct'])
-            SOUND_INCORRECT.set_volume(VOLUMES['incorrect'])
-            SOUND_PAPER_FOLD.set_volume(VOLUMES['click'])
+            apply_volumes()
         except FileNotFoundError:
             print("No settings file found. Using default volumes and settings.")
         except json.JSONDecodeError:
@@ -1192,47 +3720,54 @@ class SettingsScreen:
         settings = {'randomize': self.state.randomize}
         for key in VOLUMES:
             settings[key] = VOLUMES[key]
-        with open(os.path.join(DATA_DIR, 'settings.json'), 'w') as f:
-            json.dump(settings, f, indent=2)
-        SOUND_BUTTON_CLICK.set_volume(VOLUMES['click'])
-        SOUND_CORRECT.set_volume(VOLUMES['correct'])
-        SOUND_INCORRECT.set_volume(VOLUMES['incorrect'])
-        SOUND_PAPER_FOLD.set_volume(VOLUMES['click'])
+        persistence.replace(os.path.join(DATA_DIR, 'settings.json'), json.dumps(settings, indent=2))
+        apply_volumes()
 
     def toggle_randomize(self):
         self.state.randomize = not self.state.randomize
         self.randomize_button.set_text(f"Randomize: {'ON' if self.state.randomize else 'OFF'}")
         self.save_settings()
 
-    def handle_events(self, events):
-        for event in events:
-            for btn in self.buttons:
-                btn.handle_event(event)
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                for key, slider in self.volume_sliders.items():
-                    slider_rect = pygame.Rect(slider['x'], slider['y'], slider['width'], slider['height'])
-                    if slider_rect.collidepoint(mouse_pos):
-                        relative_x = mouse_pos[0] - slider['x']
-                        slider['value'] = max(0.0, min(1.0, relative_x / slider['width']))
-                        VOLUMES[key] = slider['value']
-                        self.save_settings()
+    def click_volume(self, key, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            slider = self.volume_sliders[key]
+            relative_x = event.pos[0] - slider['x']
+            slider['value'] = max(0.0, min(1.0, relative_x / slider['width']))
+            VOLUMES[key] = slider['value']
+            self.save_settings()
+
+    def handle_events(self, events, mouse_pos):
+        event_router.route([self.buttons, self.slider_hotspots], events, mouse_pos)
 
+    @profiled("SettingsScreen.draw")
     def draw(self, screen):
         screen.fill(WHITE)
         for btn in self.buttons:
-            btn.update_hover(pygame.mouse.get_pos())
             btn.draw(screen)
         for key, slider in self.volume_sliders.items():
             pygame.draw.rect(screen, GRAY, (slider['x'], slider['y'], slider['width'], slider['height']))
             knob_x = slider['x'] + int(slider['value'] * slider['width'])
             pygame.draw.circle(screen, BUTTON_COLOR, (knob_x, slider['y'] + slider['height'] // 2), 10)
-            label = font.render(f"{key.capitalize()} Volume: {slider['value']:.2f}", True, BLACK)
+            label = render_text(font, f"{key.capitalize()} Volume: {slider['value']:.2f}", True, BLACK)
             screen.blit(label, (slider['x'], slider['y'] - 30))
-        copyright_surf = font.render(COPYRIGHT_TEXT, True, BLACK)
+        copyright_surf = render_text(font, COPYRIGHT_TEXT, True, BLACK)
         screen.blit(copyright_surf, (20, SCREEN_HEIGHT - 40))
 
-def handle_main_menu(state, events, mouse_pos):
+def get_widgets(state, screen_name, key, build):
+    """Return the buttons of screen_name, only rebuilding them when key (their inputs) changes."""
+    cached = state.widget_trees.get(screen_name)
+    if cached is None or cached[0] != key:
+        cached = (key, build(state))
+        state.widget_trees[screen_name] = cached
+    return cached[1]
+
+@profiled("draw_widgets")
+def draw_widgets(buttons, events, mouse_pos, keyboard=None):
+    event_router.route([buttons], events, mouse_pos, keyboard=keyboard)
+    for btn in buttons:
+        btn.draw(screen)
+
+def build_main_menu(state):
     button_width = 250
     button_height = 50
     spacing = 20
@@ -1240,160 +3775,132 @@ def handle_main_menu(state, events, mouse_pos):
     y = start_y
     buttons = []
     button_configs = [
-        ("Start", lambda: setattr(state, 'current_screen', 'part_select'), FOLDER_ICON),
-        ("Settings", lambda: setattr(state, 'current_screen', 'settings'), DRIVE_ICON),
-        ("Aced Questions", lambda: setattr(state, 'current_screen', 'aced_select'), TROPHY_ICON)
+        ("Start", lambda: setattr(state, 'current_screen', 'part_select'), get_icon('folder')),
+        ("Settings", lambda: setattr(state, 'current_screen', 'settings'), get_icon('drive')),
+        ("Aced Questions", lambda: setattr(state, 'current_screen', 'aced_select'), get_icon('trophy'))
     ]
+    if state.checkpoint:
+        label = f"Resume {part_label(state.checkpoint['part'])} ({len(state.checkpoint['order'])} left)"
+        button_configs.insert(0, (label, state.resume_session, get_icon('folder')))
     for text, callback, icon in button_configs:
         btn = Button(0, y, button_width, button_height, text, callback, icon=icon)
         btn.x = SCREEN_WIDTH // 2 - btn.width // 2
         btn.rect.x = btn.x
         buttons.append(btn)
         y += btn.height + spacing
-    title = font.render("SAT Study Helper", True, BLACK)
+    return buttons
+
+def part_label(part):
+    return part.replace('1', ' 1').replace('2', ' 2').replace('3', ' 3').replace('4', ' 4').capitalize()
+
+def handle_main_menu(state, events, mouse_pos):
+    resume_key = (state.checkpoint['part'], len(state.checkpoint['order'])) if state.checkpoint else None
+    buttons = get_widgets(state, "main_menu", resume_key, build_main_menu)
+    title = render_text(font, "SAT Study Helper", True, BLACK)
     screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
-    for btn in buttons:
-        btn.update_hover(mouse_pos)
-        for event in events:
-            btn.handle_event(event)
-        btn.draw(screen)
-    copyright_surf = font.render(COPYRIGHT_TEXT, True, BLACK)
+    draw_widgets(buttons, events, mouse_pos)
+    copyright_surf = render_text(font, COPYRIGHT_TEXT, True, BLACK)
     screen.blit(copyright_surf, (20, SCREEN_HEIGHT - 40))
 
 def handle_settings_screen(state, events, mouse_pos):
-    state.settings.handle_events(events)
+    state.settings.handle_events(events, mouse_pos)
     state.settings.draw(screen)
 
-def handle_part_selection(state, events, mouse_pos):
-    screen.fill(WHITE)
+def build_part_grid(state, next_screen):
     button_width = 200
     button_height = 50
     spacing = 20
     num_columns = 3
-    total_buttons = len(SUBJECT_PARTS)
-    buttons_per_column = (total_buttons + num_columns - 1) // num_columns
-    total_columns = (total_buttons + buttons_per_column - 1) // buttons_per_column
-    total_width = total_columns * button_width + (total_columns - 1) * spacing
-    left_margin = (SCREEN_WIDTH - total_width) // 2
+    parts = state.parts
     start_y = 100
-    buttons = []
-    current_index = 0
-    for col in range(total_columns):
-        x = left_margin + col * (button_width + spacing)
-        num_buttons = min(buttons_per_column, total_buttons - current_index)
-        column_parts = SUBJECT_PARTS[current_index:current_index + num_buttons]
-        current_index += num_buttons
-        for i, part in enumerate(column_parts):
-            y = start_y + i * (button_height + spacing)
-            btn = Button(
-                x, y, button_width, button_height,
-                part.replace('1', ' 1').replace('2', ' 2').replace('3', ' 3').replace('4', ' 4').capitalize(),
-                lambda p=part: setattr(state, 'current_part', p) or setattr(state, 'current_screen', 'section_select'),
-                icon=FOLDER_ICON
-            )
-            buttons.append(btn)
+    rows = max(1, (len(parts) + num_columns - 1) // num_columns)
+    columns = (len(parts) + rows - 1) // rows or 1
+    viewport_height = min(rows * (button_height + spacing) - spacing, SCREEN_HEIGHT - button_height - 40 - start_y)
+    grid = ScrollList(
+        (0, start_y, SCREEN_WIDTH, max(0, viewport_height)), len(parts),
+        lambda i: Button(0, 0, button_width, button_height, part_label(parts[i]),
+                         lambda p=parts[i]: state.select_part(p, next_screen), icon=get_icon('folder')),
+        row_height=button_height, columns=columns, column_width=button_width, spacing=spacing, column_major=True
+    )
+    buttons = [grid]
     back_btn = Button(
         SCREEN_WIDTH // 2 - button_width // 2, SCREEN_HEIGHT - button_height - 20,
         button_width, button_height, "Back",
         lambda: setattr(state, 'current_screen', 'main_menu'),
-        icon=DRIVE_ICON
+        icon=get_icon('drive')
     )
     buttons.append(back_btn)
-    title = font.render("Select Subject Part", True, BLACK)
+    return buttons
+
+def handle_part_selection(state, events, mouse_pos):
+    screen.fill(WHITE)
+    buttons = get_widgets(state, "part_select", tuple(state.parts),
+                          lambda s: build_part_grid(s, 'section_select'))
+    title = render_text(font, "Select Subject Part", True, BLACK)
     screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
-    for btn in buttons:
-        btn.update_hover(mouse_pos)
-        for event in events:
-            btn.handle_event(event)
-        btn.draw(screen)
-    copyright_surf = font.render(COPYRIGHT_TEXT, True, BLACK)
+    draw_widgets(buttons, events, mouse_pos, keyboard=buttons[0])
+    copyright_surf = render_text(font, COPYRIGHT_TEXT, True, BLACK)
     screen.blit(copyright_surf, (20, SCREEN_HEIGHT - 40))
 
-def handle_aced_section_select(state, events, mouse_pos):
-    screen.fill(WHITE)
+def build_aced_section_list(state):
     button_width = 320
     button_height = 50
     spacing = 20
-    sections = state.all_data[state.current_part].get("sections", {})
+    part = state.current_part
+    sections = state.all_data[part].get("sections", {})
+    section_keys = list(sections)
     start_y = 100
-    y = start_y
-    buttons = []
-    for section_key, section_data in sections.items():
-        section_name = section_data.get("section_name", section_key.capitalize())
-        aced_count = len(state.aced_questions[state.current_part].get(section_key, []))
-        btn_text = f"{section_name} ({aced_count} aced)"
-        btn = Button(
-            0, y, button_width, button_height,
-            btn_text,
+
+    def make_button(i):
+        section_key = section_keys[i]
+        section_name = sections[section_key].get("section_name", section_key.capitalize())
+        aced_count = len(state.aced_questions[part].get(section_key, []))
+        return Button(
+            0, 0, button_width, button_height,
+            f"{section_name} ({aced_count} aced)",
             lambda sk=section_key: setattr(state, 'current_section', sk) or setattr(state, 'current_screen', 'aced_view'),
-            icon=FOLDER_ICON
+            icon=get_icon('folder')
         )
-        btn.x = SCREEN_WIDTH // 2 - btn.width // 2
-        btn.rect.x = btn.x
-        buttons.append(btn)
-        y += btn.height + spacing
+
+    cached = state.widget_trees.get("aced_section_select")
+    scroll_y = cached[1][0].scroll_y if cached and cached[0][0] == part else 0  # Unacing elsewhere keeps the place
+    viewport_height = min(len(section_keys) * (button_height + spacing), SCREEN_HEIGHT - start_y - button_height - 80)
+    section_list = ScrollList((0, start_y, SCREEN_WIDTH, max(0, viewport_height - spacing)), len(section_keys), make_button,
+                              row_height=button_height, spacing=spacing, scroll_y=scroll_y)
+    buttons = [section_list]
+    y = start_y + viewport_height
     back_btn = Button(
         0, y, button_width, button_height,
         "Back",
         lambda: setattr(state, 'current_screen', 'aced_select'),
-        icon=DRIVE_ICON
+        icon=get_icon('drive')
     )
     back_btn.x = SCREEN_WIDTH // 2 - back_btn.width // 2
     back_btn.rect.x = back_btn.x
     buttons.append(back_btn)
-    title = font.render(f"Aced Questions in {state.current_part.replace('1', ' 1').replace('2', ' 2').replace('3', ' 3').replace('4', ' 4').capitalize()}", True, BLACK)
+    return buttons
+
+def handle_aced_section_select(state, events, mouse_pos):
+    screen.fill(WHITE)
+    sections = state.all_data[state.current_part].get("sections", {})
+    aced = state.aced_questions[state.current_part]
+    key = (state.current_part,
+           tuple((sk, sd.get("section_name"), len(aced.get(sk, []))) for sk, sd in sections.items()))
+    buttons = get_widgets(state, "aced_section_select", key, build_aced_section_list)
+    title = render_text(font, f"Aced Questions in {part_label(state.current_part)}", True, BLACK)
     screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
-    for btn in buttons:
-        btn.update_hover(mouse_pos)
-        for event in events:
-            btn.handle_event(event)
-        btn.draw(screen)
-    copyright_surf = font.render(COPYRIGHT_TEXT, True, BLACK)
+    draw_widgets(buttons, events, mouse_pos, keyboard=buttons[0])
+    copyright_surf = render_text(font, COPYRIGHT_TEXT, True, BLACK)
     screen.blit(copyright_surf, (20, SCREEN_HEIGHT - 40))
 
 def handle_aced_select(state, events, mouse_pos):
     screen.fill(WHITE)
-    button_width = 200
-    button_height = 50
-    spacing = 20
-    num_columns = 3
-    total_buttons = len(SUBJECT_PARTS)
-    buttons_per_column = (total_buttons + num_columns - 1) // num_columns
-    total_columns = (total_buttons + buttons_per_column - 1) // buttons_per_column
-    total_width = total_columns * button_width + (total_columns - 1) * spacing
-    left_margin = (SCREEN_WIDTH - total_width) // 2
-    start_y = 100
-    buttons = []
-    current_index = 0
-    for col in range(total_columns):
-        x = left_margin + col * (button_width + spacing)
-        num_buttons = min(buttons_per_column, total_buttons - current_index)
-        column_parts = SUBJECT_PARTS[current_index:current_index + num_buttons]
-        current_index += num_buttons
-        for i, part in enumerate(column_parts):
-            y = start_y + i * (button_height + spacing)
-            btn = Button(
-                x, y, button_width, button_height,
-                part.replace('1', ' 1').replace('2', ' 2').replace('3', ' 3').replace('4', ' 4').capitalize(),
-                lambda p=part: setattr(state, 'current_part', p) or setattr(state, 'current_screen', 'aced_section_select'),
-                icon=FOLDER_ICON
-            )
-            buttons.append(btn)
-    back_btn = Button(
-        SCREEN_WIDTH // 2 - button_width // 2, SCREEN_HEIGHT - button_height - 20,
-        button_width, button_height, "Back",
-        lambda: setattr(state, 'current_screen', 'main_menu'),
-        icon=DRIVE_ICON
-    )
-    buttons.append(back_btn)
-    title = font.render("Select Subject Part for Aced Questions", True, BLACK)
+    buttons = get_widgets(state, "aced_select", tuple(state.parts),
+                          lambda s: build_part_grid(s, 'aced_section_select'))
+    title = render_text(font, "Select Subject Part for Aced Questions", True, BLACK)
     screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
-    for btn in buttons:
-        btn.update_hover(mouse_pos)
-        for event in events:
-            btn.handle_event(event)
-        btn.draw(screen)
-    copyright_surf = font.render(COPYRIGHT_TEXT, True, BLACK)
+    draw_widgets(buttons, events, mouse_pos, keyboard=buttons[0])
+    copyright_surf = render_text(font, COPYRIGHT_TEXT, True, BLACK)
     screen.blit(copyright_surf, (20, SCREEN_HEIGHT - 40))
 
 def handle_quiz_screen(state, events, mouse_pos):
@@ -1405,92 +3912,72 @@ def handle_quiz_screen(state, events, mouse_pos):
     popup_y = (SCREEN_HEIGHT - popup_height) // 2
     yes_btn = None
     no_btn = None
-    if state.main_menu_confirmation or state.reset_timer_confirmation:
-        if state.main_menu_confirmation:
-            yes_btn = Button(popup_x + popup_width // 4 - 40, popup_y + 120, 80, 40, "Yes", lambda: state.quiz.confirm_main_menu(True))
-            no_btn = Button(popup_x + 3 * popup_width // 4 - 40, popup_y + 120, 80, 40, "No", lambda: state.quiz.confirm_main_menu(False))
-        elif state.reset_timer_confirmation:
-            yes_btn = Button(popup_x + popup_width // 4 - 40, popup_y + 120, 80, 40, "Yes", lambda: state.quiz.confirm_reset_timer(True))
-            no_btn = Button(popup_x + 3 * popup_width // 4 - 40, popup_y + 120, 80, 40, "No", lambda: state.quiz.confirm_reset_timer(False))
-        for event in events:
-            if yes_btn:
-                yes_btn.handle_event(event)
-            if no_btn:
-                no_btn.handle_event(event)
-    else:
-        for btn in state.quiz.buttons:
-            btn.update_hover(mouse_pos)
-            for event in events:
-                btn.handle_event(event)
-        if state.quiz.ace_button:
-            state.quiz.ace_button.update_hover(mouse_pos)
-            for event in events:
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    if state.quiz.ace_button.rect.collidepoint(event.pos):
-                        state.quiz.ace_button.callback()
-                        print(f"Ace button clicked for question {state.quiz.state.current_question['id']}")
-                        state.quiz.ace_button = None
-        for event in events:
-            state.quiz.answer_box.handle_event(event)
-            state.quiz.solution_sheet.handle_event(event, state.quiz)
+    if state.main_menu_confirmation:
+        yes_btn, no_btn = state.quiz.main_menu_popup_buttons
+    elif state.reset_timer_confirmation:
+        yes_btn, no_btn = state.quiz.reset_popup_buttons
+    quiz = state.quiz
+    widgets = [quiz.question_view, quiz.answer_box]
+    if quiz.ace_button:
+        widgets.append(quiz.ace_button)
+    widgets.append(quiz.solution_sheet)  # Drawn last, so it sits on top
+    event_router.route([quiz.buttons, widgets], events, mouse_pos, [yes_btn, no_btn] if yes_btn else None)
     state.quiz.draw(screen)
     if state.main_menu_confirmation:
         pygame.draw.rect(screen, GRAY, (popup_x, popup_y, popup_width, popup_height))
-        wrapped_lines = textwrap.wrap("Return to Main Menu?", width=(popup_width - 40) // font.size(" ")[0])
+        wrapped_lines = wrap_text("Return to Main Menu?", (popup_width - 40) // font.size(" ")[0])
         max_line_width = max([font.size(line)[0] for line in wrapped_lines], default=0)
         text_x = popup_x + (popup_width - max_line_width) // 2
         text_y = popup_y + 20
         for line in wrapped_lines:
-            text_surface = font.render(line, True, BLACK)
+            text_surface = render_text(font, line, True, BLACK)
             screen.blit(text_surface, (text_x, text_y))
             text_y += font.get_height()
         if yes_btn and no_btn:
-            yes_btn.update_hover(mouse_pos)
-            no_btn.update_hover(mouse_pos)
             yes_btn.draw(screen)
             no_btn.draw(screen)
     elif state.reset_timer_confirmation:
         pygame.draw.rect(screen, GRAY, (popup_x, popup_y, popup_width, popup_height))
-        wrapped_lines = textwrap.wrap("Are you sure you want to reset the timer?", width=(popup_width - 40) // font.size(" ")[0])
+        wrapped_lines = wrap_text("Are you sure you want to reset the timer?", (popup_width - 40) // font.size(" ")[0])
         max_line_width = max([font.size(line)[0] for line in wrapped_lines], default=0)
         text_x = popup_x + (popup_width - max_line_width) // 2
         text_y = popup_y + 20
         for line in wrapped_lines:
-            text_surface = font.render(line, True, BLACK)
+            text_surface = render_text(font, line, True, BLACK)
             screen.blit(text_surface, (text_x, text_y))
             text_y += font.get_height()
         if yes_btn and no_btn:
-            yes_btn.update_hover(mouse_pos)
-            no_btn.update_hover(mouse_pos)
             yes_btn.draw(screen)
             no_btn.draw(screen)
 
-def handle_section_selection(state, events, mouse_pos):
-    screen.fill(WHITE)
+def build_section_list(state):
     button_width = 320
     button_height = 50
     spacing = 20
-    sections = state.all_data[state.current_part].get("sections", {})
+    part = state.current_part
+    sections = state.all_data[part].get("sections", {})
+    section_keys = list(sections)
     start_y = 100
-    y = start_y
-    buttons = []
-    for section_key, section_data in sections.items():
-        section_name = section_data.get("section_name", section_key.capitalize())
-        btn = Button(
-            0, y, button_width, button_height,
-            section_name,
-            lambda sk=section_key: state.start_new_session(state.current_part, [sk]),
-            icon=FOLDER_ICON
+
+    def make_button(i):
+        section_key = section_keys[i]
+        return Button(
+            0, 0, button_width, button_height,
+            sections[section_key].get("section_name", section_key.capitalize()),
+            lambda sk=section_key: state.start_new_session(part, [sk]),
+            icon=get_icon('folder')
         )
-        btn.x = SCREEN_WIDTH // 2 - btn.width // 2
-        btn.rect.x = btn.x
-        buttons.append(btn)
-        y += btn.height + spacing
+
+    viewport_height = min(len(section_keys) * (button_height + spacing), SCREEN_HEIGHT - start_y - 2 * (button_height + spacing) - 80)
+    section_list = ScrollList((0, start_y, SCREEN_WIDTH, max(0, viewport_height - spacing)), len(section_keys), make_button,
+                              row_height=button_height, spacing=spacing)
+    buttons = [section_list]
+    y = start_y + viewport_height
     all_btn = Button(
         0, y, button_width, button_height,
         "All Sections",
-        lambda: state.start_new_session(state.current_part, list(sections.keys())),
-        icon=FOLDER_ICON
+        lambda: state.start_new_session(part, list(sections.keys())),
+        icon=get_icon('folder')
     )
     all_btn.x = SCREEN_WIDTH // 2 - all_btn.width // 2
     all_btn.rect.x = all_btn.x
@@ -1500,93 +3987,136 @@ def handle_section_selection(state, events, mouse_pos):
         0, y, button_width, button_height,
         "Back",
         lambda: setattr(state, 'current_screen', 'part_select'),
-        icon=DRIVE_ICON
+        icon=get_icon('drive')
     )
     back_btn.x = SCREEN_WIDTH // 2 - back_btn.width // 2
     back_btn.rect.x = back_btn.x
     buttons.append(back_btn)
-    title = font.render(f"Select Sections for {state.current_part.replace('1', ' 1').replace('2', ' 2').replace('3', ' 3').replace('4', ' 4').capitalize()}", True, BLACK)
+    return buttons
+
+def handle_section_selection(state, events, mouse_pos):
+    screen.fill(WHITE)
+    sections = state.all_data[state.current_part].get("sections", {})
+    key = (state.current_part, tuple((sk, sd.get("section_name")) for sk, sd in sections.items()))
+    buttons = get_widgets(state, "section_select", key, build_section_list)
+    title = render_text(font, f"Select Sections for {part_label(state.current_part)}", True, BLACK)
     screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
-    for btn in buttons:
-        btn.update_hover(mouse_pos)
-        for event in events:
-            btn.handle_event(event)
-        btn.draw(screen)
-    copyright_surf = font.render(COPYRIGHT_TEXT, True, BLACK)
+    draw_widgets(buttons, events, mouse_pos, keyboard=buttons[0])
+    copyright_surf = render_text(font, COPYRIGHT_TEXT, True, BLACK)
     screen.blit(copyright_surf, (20, SCREEN_HEIGHT - 40))
 
-def main():
-    initialize_json_files()
+def scene_key(state):
+    """Everything a screen draws that is not tracked per widget; a change forces a full flip."""
+    name = state.current_screen
+    if name == "quiz":
+        quiz = state.quiz
+        question = state.current_question
+        return (name, question.id if question else None, question.section_name if question else None,
+                quiz.current_question_index, len(state.current_session.get('remaining', [])),
+                state.show_answer, quiz.show_clock, quiz.question_scroll_y,
+                state.main_menu_confirmation, state.reset_timer_confirmation,
+                quiz.solution_sheet.preview_active, quiz.solution_sheet.opened, quiz.ace_button is None)
+    if name == "aced_view":
+        view = state.aced_view
+        aced_list = state.aced_questions.get(state.current_part, {}).get(getattr(state, 'current_section', None), [])
+        return (name, state.current_part, getattr(state, 'current_section', None), view.current_aced_index,
+                len(aced_list), view.unace_confirmation, view.show_image_popup, view.solution_sheet.opened, view.image_state)
+    if name == "settings":
+        return (name, state.randomize, tuple(slider['value'] for slider in state.settings.volume_sliders.values()))
+    cached = state.widget_trees.get(name)
+    return (name, state.current_part, cached[0] if cached else None)
+
+def draw_frame(state, events, mouse_pos):
+    """Run the current screen's handler for one frame; the caller presents the result."""
+    screen.fill(WHITE)
+    if state.current_screen == "main_menu":
+        handle_main_menu(state, events, mouse_pos)
+    elif state.current_screen == "part_select":
+        handle_part_selection(state, events, mouse_pos)
+    elif state.current_screen == "section_select":
+        handle_section_selection(state, events, mouse_pos)
+    elif state.current_screen == "quiz":
+        handle_quiz_screen(state, events, mouse_pos)
+    elif state.current_screen == "aced_select":
+        handle_aced_select(state, events, mouse_pos)
+    elif state.current_screen == "aced_section_select":
+        handle_aced_section_select(state, events, mouse_pos)
+    elif state.current_screen == "aced_view":
+        state.aced_view.handle_events(events, mouse_pos)
+        state.aced_view.draw(screen)
+    elif state.current_screen == "settings":
+        handle_settings_screen(state, events, mouse_pos)
+
+def quit_app(state=None):
+    storage.close(state.all_data if state else {})
+    derived_images.flush()
+    persistence.flush()
+    print(f"Persistence stats: {persistence.stats()}")
+    if state and state.loader:
+        state.loader.executor.shutdown(wait=False, cancel_futures=True)
+        print(f"Part load timings (ms): {', '.join(f'{p}={t:.1f}' for p, t in state.loader.timings.items())}")
+    print(f"Image cache stats: {image_cache.stats()}")
+    print(f"Derived image stats: {derived_images.stats()}")
+    print(f"Thumbnail stats: {thumbnails.stats()}")
+    print(f"Text cache stats: {text_cache.stats()}")
+    print(f"Display update stats: {dirty_regions.stats()}")
+    print(f"Frame profile (ms p50/p95/max): {frame_profiler.stats()}")
+    print(f"Audio stats: {audio_stats.stats()}")
+    print(f"Event routing stats: {event_router.stats()}")
+    pygame.quit()
+    sys.exit()
+
+def create_app(headless=False):
+    """Open the window and build a wired GameState without entering the main loop."""
+    init_display(headless)
+    storage.initialize()
     state = GameState()
-    state.settings = SettingsScreen(state) 
+    state.parts = storage.list_parts()
+    state.settings = SettingsScreen(state)
     state.quiz = QuizScreen(state)
     state.aced_view = AcedViewScreen(state)
-    total_files = len(SUBJECT_PARTS)
-    loaded_files = 0
-    for part in SUBJECT_PARTS:
-        filename = f"{part}.json"
-        filepath = os.path.join(DATA_DIR, filename)
-        data = load_json(filepath)
-        message = f"Loaded from {filepath}"
-        draw_loading_screen(screen, message)
-        state.all_data[part] = data
-        loaded_files += 1
-        progress_message = f"{loaded_files}/{total_files} files loaded"
-        progress_text = font.render(progress_message, True, WHITE)
-        progress_rect = progress_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
-        screen.blit(progress_text, progress_rect)
-        pygame.display.flip()
-    state.load_aced_questions()
+    state.checkpoint = state.checkpoints.load()
+    if state.checkpoint and state.checkpoint.get('part') not in state.parts:
+        state.checkpoint = None
+    parts = list(state.parts)
+    if state.checkpoint:
+        parts.remove(state.checkpoint['part'])
+        parts.insert(0, state.checkpoint['part'])  # Load the session's part before the rest
+    state.loader = PartLoader(parts)
+    state.loader.start()  # Parts are parsed in the background and materialized on selection
+    return state
+
+def main(headless=False):
+    state = create_app(headless)
     while True:
-        events = pygame.event.get()
-        mouse_pos = pygame.mouse.get_pos()
+        frame_profiler.begin_frame()
+        events, mouse_pos = event_router.pump()
         for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if state.current_screen == "quiz" and event.type == pygame.MOUSEWHEEL:
-                if pygame.Rect(30, 100, 500, 500).collidepoint(mouse_pos) and state.quiz.question_image_height > 500:
-                    state.quiz.question_scroll_y = max(0, min(state.quiz.question_scroll_y - event.y * 30, state.quiz.question_image_height - 500))
-        screen.fill(WHITE)
-        if state.current_screen == "main_menu":
-            handle_main_menu(state, events, mouse_pos)
-        elif state.current_screen == "part_select":
-            handle_part_selection(state, events, mouse_pos)
-        elif state.current_screen == "section_select":
-            handle_section_selection(state, events, mouse_pos)
-        elif state.current_screen == "quiz":
-            handle_quiz_screen(state, events, mouse_pos)
-        elif state.current_screen == "aced_select":
-            handle_aced_select(state, events, mouse_pos)
-        elif state.current_screen == "aced_section_select":
-            handle_aced_section_select(state, events, mouse_pos)
-        elif state.current_screen == "aced_view":
-            state.aced_view.draw(screen)
-            if state.aced_view.show_image_popup and state.aced_view.close_button:
-                for event in events:
-                    state.aced_view.close_button.handle_event(event)
-            if state.aced_view.unace_confirmation:
-                popup_width, popup_height = 400, 200
-                popup_x, popup_y = (SCREEN_WIDTH - popup_width) // 2, (SCREEN_HEIGHT - popup_height) // 2
-                yes_btn = Button(popup_x + 100, popup_y + 120, 80, 40, "Yes", lambda: state.aced_view.confirm_unace(True))
-                no_btn = Button(popup_x + 220, popup_y + 120, 80, 40, "No", lambda: state.aced_view.confirm_unace(False))
-                for event in events:
-                    yes_btn.handle_event(event)
-                    no_btn.handle_event(event)
-            else:
-                aced_list = state.aced_view.state.aced_questions[state.aced_view.state.current_part][state.aced_view.state.current_section]
-                for event in events:
-                    state.aced_view.handle_slider(mouse_pos, [event])
-                    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                        state.aced_view.handle_image_click(event.pos)
-                    for btn in state.aced_view.buttons:
-                        btn.handle_event(event)
-                    if not aced_list:
-                        state.aced_view.no_aced_back_btn.handle_event(event)
-        elif state.current_screen == "settings":
-            handle_settings_screen(state, events, mouse_pos)
-        pygame.display.flip()
-        clock.tick(30)
+                quit_app(state)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+                frame_profiler.show_overlay = not frame_profiler.show_overlay
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                dirty_regions.show_debug = not dirty_regions.show_debug
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                frame_profiler.export_trace()
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                dirty_regions.mark_all()
+            if event.type == pygame.WINDOWFOCUSGAINED:
+                image_cache.invalidate()  # Images may have been edited while the app was in the background
+        frame_profiler.phase("events")
+        screen_name = state.current_screen
+        draw_frame(state, events, mouse_pos)
+        state.save_checkpoint()
+        frame_profiler.phase(f"screen:{screen_name}")
+        frame_profiler.draw_overlay(screen)
+        dirty_regions.present(screen, scene_key(state))
+        frame_profiler.phase("present")
+        clock.tick(FRAME_RATE)
+        frame_profiler.phase("tick")
+        frame_profiler.end_frame()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(storage_command(sys.argv[1:]))
     main()
\ No newline at end of file
@@ -0,0 +1,340 @@
+import os  # Filepath operations
+import sys  # Exit codes
+import json  # Results, baselines and generated banks
+import time  # Timers
+import random  # Seeded synthetic data
+import shutil  # Copying assets into the work dir
+import tempfile  # Throwaway work dir
+import argparse  # Command line
+import platform  # Machine info stored with the results
+import contextlib  # Silencing the app's prints while timing
+import io  # Sink for those prints
+import subprocess  # Fresh interpreter for the memory probe
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout clean JSON
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIRS = ("Meshes", "Sounds")
+
+# Loads one part in a fresh interpreter, so interned strings and tag tuples are counted rather than already cached
+MEMORY_PROBE = """
+import sys, json, tracemalloc
+sys.path.insert(0, sys.argv[1])
+import Main
+tracemalloc.start()
+loaded = Main.storage.load_part(sys.argv[2])
+size = tracemalloc.get_traced_memory()[0]
+print(json.dumps([size, sum(len(section.get("questions", [])) for section in loaded.get("sections", {}).values())]))
+"""
+
+# parts, sections per part, questions per section
+PRESETS = {
+    'small': (12, 3, 10),
+    'medium': (50, 3, 1000),
+    'large': (500, 3, 10000),
+}
+
+def section_key(index):
+    return f"section{chr(ord('A') + index)}" if index < 26 else f"section{index + 1}"
+
+def make_png(path, size, rng, lines):
+    """Save a page-like PNG: white background, rows of dark strokes and a few figures."""
+    import pygame
+    surface = pygame.Surface(size)
+    surface.fill((255, 255, 255))
+    width, height = size
+    y = 30
+    for _ in range(lines):
+        x = 30
+        while x < width - 60:
+            word = rng.randint(15, 70)
+            pygame.draw.rect(surface, (20, 20, 20), (x, y, word, 12))
+            x += word + rng.randint(8, 14)
+        y += 26
+        if y > height - 40:
+            break
+    for _ in range(rng.randint(1, 3)):
+        center = (rng.randint(80, width - 80), rng.randint(80, height - 80))
+        pygame.draw.circle(surface, (0, 0, 0), center, rng.randint(30, 70), 2)
+    pygame.image.save(surface, path)
+
+def generate_bank(root, parts, sections, questions, images, seed):
+    """Write sat_data/<part>.json files that reference a pool of generated question and answer sheet images."""
+    rng = random.Random(seed)
+    image_dir = os.path.join(root, "images", "bench")
+    os.makedirs(image_dir, exist_ok=True)
+    os.makedirs(os.path.join(root, "sat_data"), exist_ok=True)
+    pool = []
+    for index in range(images):
+        image = f"images/bench/question{index + 1}.png"
+        sheet = f"images/bench/answersheet{index + 1}.png"
+        make_png(os.path.join(root, image), (rng.randint(700, 1000), rng.randint(400, 1300)), rng, rng.randint(4, 20))
+        make_png(os.path.join(root, sheet), (800, rng.randint(1600, 3000)), rng, 120)
+        pool.append((image, sheet))
+    names = [f"bench{index + 1}" for index in range(parts)]
+    for part in names:
+        data = {"sections": {}}
+        for s in range(sections):
+            items = []
+            for q in range(questions):
+                image, sheet = pool[rng.randrange(len(pool))]
+                if rng.random() < 0.5:
+                    answer, tags = rng.choice("ABCD"), ["Multi-Choice"]
+                else:
+                    answer, tags = str(rng.choice([rng.randint(1, 500), round(rng.uniform(0, 100), 2)])), ["Fill-in"]
+                items.append({"id": f"q{q + 1}", "image": image, "answer": answer, "answer_sheet": sheet, "tags": tags})
+            data["sections"][section_key(s)] = {"section_name": f"Bench section {s + 1}", "questions": items}
+        with open(os.path.join(root, "sat_data", f"{part}.json"), 'w') as f:
+            json.dump(data, f, indent=2)
+    return names
+
+def prepare_workdir(root, config):
+    """Generate the bank unless root already holds one built from the same config."""
+    manifest_path = os.path.join(root, "bench_manifest.json")
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("config") == config:
+            return manifest["parts"]
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    for name in ASSET_DIRS:
+        target = os.path.join(root, name)
+        if not os.path.exists(target):
+            shutil.copytree(os.path.join(REPO_DIR, name), target)
+    start = time.perf_counter()
+    names = generate_bank(root, config['parts'], config['sections'], config['questions'], config['images'], config['seed'])
+    print(f"Generated {len(names)} parts in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    with open(manifest_path, 'w') as f:
+        json.dump({"config": config, "parts": names}, f, indent=2)
+    return names
+
+def summarize(samples):
+    """Milliseconds summary of a list of seconds."""
+    ordered = sorted(sample * 1000 for sample in samples)
+    if not ordered:
+        return {"n": 0}
+    return {
+        "n": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def time_frames(app, state, frames, before_frame=None):
+    """Draw and present the current screen the way main() does, timing each phase."""
+    draw, present = [], []
+    for _ in range(frames):
+        app.pygame.event.pump()
+        if before_frame:
+            before_frame()
+        start = time.perf_counter()
+        app.draw_frame(state, [], (0, 0))
+        middle = time.perf_counter()
+        app.dirty_regions.present(app.screen, app.scene_key(state))
+        draw.append(middle - start)
+        present.append(time.perf_counter() - middle)
+    return {"draw": summarize(draw), "present": summarize(present)}
+
+def part_memory(part, backend):
+    """Bytes traced while loading part in a new process, and its question count."""
+    env = dict(os.environ, SAT_STORAGE=backend)
+    output = subprocess.run([sys.executable, "-c", MEMORY_PROBE, REPO_DIR, part], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmarks(parts, config):
+    results = {"frames": {}}
+    import pygame  # Imported up front so import_ms covers Main alone, whether or not the bank was just generated
+    start = time.perf_counter()
+    import Main as app
+    results["import_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    app.SUBJECT_PARTS = list(parts)
+    app.SUBMIT_COOLDOWN = 0
+    if config['backend'] == "sqlite":
+        app.import_json_to_sqlite()
+        app.storage = app.SqliteStore()
+
+    # Startup: window, state and the first presented main menu frame
+    start = time.perf_counter()
+    state = app.create_app(headless=True)
+    app.draw_frame(state, [], (0, 0))
+    app.dirty_regions.present(app.screen, app.scene_key(state))
+    results["startup_to_menu_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    while state.loader.loaded_count() < len(parts):
+        time.sleep(0.001)
+    results["all_parts_loaded_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    frames = config['frames']
+    results["frames"]["main_menu"] = time_frames(app, state, frames)
+    state.current_screen = "part_select"
+    results["frames"]["part_select"] = time_frames(app, state, frames)
+
+    part = parts[0]
+    section = section_key(0)
+    results["select_part_ms"] = round(timed(state.select_part, part, "section_select") * 1000, 3)
+    results["frames"]["section_select"] = time_frames(app, state, frames)
+
+    app.persistence.flush()  # The probe reads the same progress files
+    part_bytes, count = part_memory(part, config['backend'])
+    results["bytes_per_question"] = round(part_bytes / max(1, count))
+
+    results["start_session_ms"] = round(timed(state.start_new_session, part, [section]) * 1000, 3)
+    results["frames"]["quiz"] = time_frames(app, state, frames)
+
+    quiz = state.quiz
+    def step_question():
+        before = quiz.current_question_index
+        quiz.next_question()
+        if quiz.current_question_index == before:
+            quiz.current_question_index = 0
+            state.current_question = state.current_session['remaining'][0]
+    results["frames"]["quiz_navigate"] = time_frames(app, state, frames, step_question)
+
+    questions = state.current_session['remaining']
+    samples = []
+    for index in range(config['samples']):
+        question = questions[index % len(questions)]
+        state.current_question = question
+        quiz.answer_box.text = question.answer if index % 2 == 0 else "wrong"
+        samples.append(timed(quiz.check_answer))
+    results["check_answer"] = summarize(samples)
+    quiz.solution_sheet.preview_active = False
+    app.image_prefetcher.cancel()
+
+    aced = list(questions[:config['samples']])
+    results["ace"] = summarize([timed(state.save_aced_question, part, section, question) for question in aced])
+    results["ace_flush_ms"] = round(timed(app.persistence.flush) * 1000, 3)
+
+    state.current_screen = "aced_select"
+    results["frames"]["aced_select"] = time_frames(app, state, frames)
+    state.current_screen = "aced_section_select"
+    results["frames"]["aced_section_select"] = time_frames(app, state, frames)
+    state.current_screen = "aced_view"
+    state.current_section = section
+    state.aced_view.current_aced_index = 0
+    results["frames"]["aced_view"] = time_frames(app, state, frames)
+
+    results["unace"] = summarize([timed(state.unace_question, part, section, question.id) for question in aced])
+    results["unace_flush_ms"] = round(timed(app.persistence.flush) * 1000, 3)
+
+    state.current_screen = "settings"
+    results["frames"]["settings"] = time_frames(app, state, frames)
+
+    app.storage.close(state.all_data)
+    app.derived_images.flush()
+    app.persistence.flush()
+    state.loader.executor.shutdown(wait=False, cancel_futures=True)
+    results["image_cache"] = app.image_cache.stats()
+    return results
+
+def flatten(results, prefix=""):
+    """Dotted metric name -> milliseconds, skipping sample counts and cache stats."""
+    metrics = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if key in ("n", "image_cache"):
+            continue
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)):
+            metrics[name] = value
+    return metrics
+
+def compare(current, baseline, tolerance, min_delta):
+    """Metrics that got slower than the baseline by more than tolerance and min_delta ms."""
+    regressions = []
+    old = flatten(baseline.get("results", {}))
+    for name, value in flatten(current["results"]).items():
+        if name.endswith((".p95", ".max")):
+            continue  # Tails are reported but too noisy to gate on
+        if name in old and value > old[name] * (1 + tolerance) and value - old[name] > min_delta:
+            regressions.append({"metric": name, "baseline": old[name], "current": value,
+                                "ratio": round(value / old[name], 2) if old[name] else None})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Main.py against a generated question bank.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--parts", type=int, help="Part files to generate (preset default)")
+    parser.add_argument("--sections", type=int, help="Sections per part (preset default)")
+    parser.add_argument("--questions", type=int, help="Questions per section (preset default)")
+    parser.add_argument("--images", type=int, default=24, help="Distinct question/answer sheet image pairs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=60, help="Frames timed per screen")
+    parser.add_argument("--samples", type=int, default=50, help="check_answer and ace/unace calls timed")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--workdir", help="Keep the generated bank here and reuse it on later runs")
+    parser.add_argument("--output", help="Write results JSON here instead of stdout")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown ratio before a metric is flagged")
+    parser.add_argument("--min-delta", type=float, default=0.5, help="Ignore slowdowns smaller than this many ms")
+    args = parser.parse_args(argv)
+    # The run below changes directory, relative paths are meant from where the tool was started
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    parts, sections, questions = PRESETS[args.preset]
+    config = {
+        'parts': args.parts or parts,
+        'sections': args.sections or sections,
+        'questions': args.questions or questions,
+        'images': args.images,
+        'seed': args.seed,
+    }
+    root = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="educa-bench-")
+    os.makedirs(root, exist_ok=True)
+    start_dir = os.getcwd()
+    try:
+        names = prepare_workdir(root, config)
+        os.chdir(root)
+        run_config = dict(config, frames=args.frames, samples=min(args.samples, config['questions']), backend=args.backend)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_benchmarks(names, run_config)
+    finally:
+        os.chdir(start_dir)
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    import pygame
+    report = {
+        "meta": {
+            "config": run_config,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    status = 0
+    if baseline_path and args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {baseline_path}", file=sys.stderr)
+    elif baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("config") != run_config:
+            print("Warning: baseline was recorded with a different config", file=sys.stderr)
+        report["regressions"] = compare(report, baseline, args.tolerance, args.min_delta)
+        for item in report["regressions"]:
+            print(f"Regression: {item['metric']} {item['baseline']} -> {item['current']} ms", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+    text = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
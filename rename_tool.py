@@ -1,49 +1,173 @@
 import os
 import shutil
 import re
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-def rename_images(source_dir, destination_dir):
+# Scan prefix -> section key, f/s/t are the first three sections of a book
+SECTION_PREFIXES = {'f': 'sectionA', 's': 'sectionB', 't': 'sectionC'}
+
+# regex, raw scans ("fq12.png") and files this tool already renamed ("sectionB_answersheet3.png")
+SCAN_PATTERN = re.compile(r"([a-z])([qa])(\d+)\.png")
+RENAMED_PATTERN = re.compile(r"(?:(section[a-z])_)?(question|answersheet)(\d+)\.png")
+
+def parse_name(filename):
+    """Return (section key, "question" or "answersheet", number) or None if filename is not a scan."""
+    filename_lower = filename.lower()
+    match = SCAN_PATTERN.fullmatch(filename_lower)
+    if match:
+        prefix, type_, number = match.groups()
+        if prefix not in SECTION_PREFIXES:
+            return None
+        return SECTION_PREFIXES[prefix], "question" if type_ == "q" else "answersheet", int(number)
+    match = RENAMED_PATTERN.fullmatch(filename_lower)
+    if match:
+        section, kind, number = match.groups()
+        section = f"section{section[-1].upper()}" if section else "sectionA"
+        return section, kind, int(number)
+    return None
+
+def target_name(section, kind, number, per_section_dirs):
+    if per_section_dirs:
+        return os.path.join(section, f"{kind}{number}.png")
+    if section == "sectionA":  # First section keeps the short names
+        return f"{kind}{number}.png"
+    return f"{section}_{kind}{number}.png"
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def is_unchanged(src_path, dst_path, verify_hash):
+    """Same size and mtime counts as unchanged; with verify_hash a differing mtime falls back to hashing."""
+    try:
+        src_stat = os.stat(src_path)
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if src_stat.st_ino == dst_stat.st_ino and src_stat.st_dev == dst_stat.st_dev:
+        return True  # Already hardlinked
+    if int(src_stat.st_mtime) == int(dst_stat.st_mtime):
+        return True
+    return verify_hash and file_hash(src_path) == file_hash(dst_path)
+
+def ingest_file(src_path, dst_path, hardlink, verify_hash):
+    """Copy or link one file; returns "skipped", "linked" or "copied"."""
+    if is_unchanged(src_path, dst_path, verify_hash):
+        return "skipped"
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    if hardlink:
+        try:
+            if os.path.exists(dst_path):
+                os.remove(dst_path)
+            os.link(src_path, dst_path)
+            return "linked"
+        except OSError:
+            pass  # Different filesystem, copy instead
+    temp_path = f"{dst_path}.tmp"
+    shutil.copy2(src_path, temp_path)  # copy2 keeps the mtime the next run compares against
+    os.replace(temp_path, dst_path)
+    return "copied"
+
+def rename_images(source_dir, destination_dir, hardlink=False, verify_hash=False, per_section_dirs=False, workers=8):
+    """Copy every recognized scan into destination_dir; returns {section: {number: {kind: path}}}."""
     os.makedirs(destination_dir, exist_ok=True)
-    
-    # regex
-    pattern = re.compile(r"([fst])([qa])(\d+)\.png")
-    
-    for filename in os.listdir(source_dir):
-        filename_lower = filename.lower()
-        match = pattern.match(filename_lower)
-        if match:
-            section, type_, number = match.groups()
-            
-            number = str(int(number))
-            
-            if section == "f":  # First section
-                if type_ == "q":
-                    target_name = f"question{number}.png"
-                elif type_ == "a":
-                    target_name = f"answersheet{number}.png"
-            elif section == "s":  # Second section
-                if type_ == "q":
-                    target_name = f"sectionB_question{number}.png"
-                elif type_ == "a":
-                    target_name = f"sectionB_answersheet{number}.png"
-            elif section == "t":  # Third section
-                if type_ == "q":
-                    target_name = f"sectionC_question{number}.png"
-                elif type_ == "a":
-                    target_name = f"sectionC_answersheet{number}.png"
-            
-            src_path = os.path.join(source_dir, filename)
-            dst_path = os.path.join(destination_dir, target_name)
-            
+    jobs = []
+    for filename in sorted(os.listdir(source_dir)):
+        parsed = parse_name(filename)
+        if not parsed:
+            print(f"Error parsing {filename}: does not match expected pattern")
+            continue
+        section, kind, number = parsed
+        jobs.append((filename, parsed, os.path.join(destination_dir, target_name(section, kind, number, per_section_dirs))))
+
+    found = {}
+    counts = {"copied": 0, "linked": 0, "skipped": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [(executor.submit(ingest_file, os.path.join(source_dir, filename), dst_path, hardlink, verify_hash),
+                    filename, parsed, dst_path) for filename, parsed, dst_path in jobs]
+        for future, filename, (section, kind, number), dst_path in futures:
             try:
-                shutil.copy(src_path, dst_path)
-                print(f"Copied {filename} to {dst_path}")
+                counts[future.result()] += 1
             except Exception as e:
                 print(f"Error copying {filename}: {e}")
-        else:
-            print(f"Error parsing {filename}: does not match expected pattern")
+                counts["failed"] += 1
+                continue
+            found.setdefault(section, {}).setdefault(number, {})[kind] = dst_path.replace(os.sep, "/")
+    print(f"Copied {counts['copied']}, linked {counts['linked']}, skipped {counts['skipped']} unchanged, {counts['failed']} failed")
+    return found
+
+def update_bank(bank_path, found, tags):
+    """Add sections and questions for the ingested images to a sat_data part file, keeping existing answers.
+
+    Returns False without writing if the existing file cannot be parsed.
+    """
+    try:
+        with open(bank_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"Error reading {bank_path}: {e}. Fix the file and run again, it was not changed")
+        return False
+    sections = data.setdefault("sections", {})
+    added = 0
+    missing_answers = 0
+    for section_key in sorted(found):
+        section = sections.setdefault(section_key, {"section_name": f"Section {section_key[-1]}", "questions": []})
+        by_id = {q['id']: q for q in section.setdefault("questions", [])}
+        for number in sorted(found[section_key]):
+            files = found[section_key][number]
+            if "question" not in files:
+                print(f"Warning: {section_key} answer sheet {number} has no question image")
+                continue
+            question = by_id.get(f"q{number}")
+            if question is None:
+                question = {"id": f"q{number}", "image": files["question"], "answer": ""}
+                if "answersheet" in files:
+                    question["answer_sheet"] = files["answersheet"]
+                question["tags"] = list(tags)
+                section["questions"].append(question)
+                added += 1
+            question["image"] = files["question"]
+            if "answersheet" in files:
+                question["answer_sheet"] = files["answersheet"]
+        missing_answers += sum(1 for q in section["questions"] if not q.get("answer"))
+    os.makedirs(os.path.dirname(bank_path) or ".", exist_ok=True)
+    temp_path = f"{bank_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, bank_path)
+    print(f"Updated {bank_path}: {added} new questions, {missing_answers} still need an answer")
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Copy scanned question and answer sheet images into place and add them to a part's JSON bank.")
+    parser.add_argument("source", help="Folder of scans named like fq1.png / sa12.png")
+    parser.add_argument("part", help="Part name, e.g. arithmetic1")
+    parser.add_argument("--dest", help="Image folder (default images/<part>)")
+    parser.add_argument("--data-dir", default="sat_data")
+    parser.add_argument("--hardlink", action="store_true", help="Hardlink instead of copying when on the same filesystem")
+    parser.add_argument("--verify-hash", action="store_true", help="Compare contents when sizes match but mtimes differ")
+    parser.add_argument("--per-section-dirs", action="store_true", help="Write images/<part>/sectionA/question1.png instead of flat names")
+    parser.add_argument("--tags", nargs="*", default=["Multi-Choice"], help="Tags for newly added questions")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--no-json", action="store_true", help="Only copy the images")
+    args = parser.parse_args(argv)
 
-source_directory = "sample"  
-destination_directory = "images/arithmetic1"  
+    destination_dir = args.dest or f"images/{args.part}"
+    found = rename_images(args.source, destination_dir, args.hardlink, args.verify_hash, args.per_section_dirs, args.workers)
+    if not args.no_json and not update_bank(os.path.join(args.data_dir, f"{args.part}.json"), found, args.tags):
+        return 1
+    return 0
 
-rename_images(source_directory, destination_directory)
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())